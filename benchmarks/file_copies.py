@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Measure memory and copies on the file download path.
+
+Compares the previous in-memory handling of a NomadNet file response (read
+the Reticulum resource file into bytes, keep it until collected, wrap it in
+BytesIO to serve it, base64 it for the SSE endpoint) with the current path
+that moves the resource file to the download spool. A second section covers
+list responses, whose chunks arrive as bytes or as latin-1 strings, and the
+binary page preview.
+
+Reticulum is not started; a response is simulated by opening a temporary
+file the same way RNS hands file responses to the response callback.
+
+    python benchmarks/file_copies.py --size-mb 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rbrowser.nomadnet import NomadNetFileBrowser  # noqa: E402
+
+
+def measure(label: str, size: int, func) -> None:
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<44} peak {peak / 1048576:8.2f} MiB  ({peak / size:4.1f}x payload)  {elapsed * 1000:8.1f} ms")
+
+
+def legacy_file_response(resource_path: str, with_sse: bool) -> None:
+    # Previous behaviour: _read_file_object -> download_results -> BytesIO.
+    handle = open(resource_path, "rb")
+    handle.seek(0)
+    content = handle.read()
+    handle.close()
+    results = {"content": content}
+    served = io.BytesIO(results["content"])
+    if with_sse:
+        base64.b64encode(served.getvalue()).decode("utf-8")
+    served.close()
+
+
+def legacy_list_response(data: list) -> bytes:
+    # Previous _handle_list_response: join bytes chunks as they are, and
+    # encode string chunks back to bytes with latin-1 before joining.
+    if all(isinstance(item, bytes) for item in data):
+        return b"".join(data)
+    binary_parts = []
+    for item in data:
+        if isinstance(item, bytes):
+            binary_parts.append(item)
+        elif isinstance(item, str):
+            binary_parts.append(item.encode("latin1"))
+    return b"".join(binary_parts)
+
+
+def spooled_file_response(browser: NomadNetFileBrowser, resource_path: str, dest_path: str) -> None:
+    handle = open(resource_path, "rb")
+    browser._spool_to_file(handle, dest_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=16, help="simulated file size (default: 16)")
+    args = parser.parse_args()
+    size = args.size_mb * 1024 * 1024
+    payload = os.urandom(size)
+
+    browser = object.__new__(NomadNetFileBrowser)
+    with tempfile.TemporaryDirectory() as workdir:
+
+        def make_resource() -> str:
+            path = os.path.join(workdir, "resource")
+            with open(path, "wb") as handle:
+                handle.write(payload)
+            return path
+
+        print(f"File response of {args.size_mb} MiB")
+        measure("before: read, hold, BytesIO", size, lambda: legacy_file_response(make_resource(), False))
+        measure("before: read, hold, BytesIO, base64 (SSE)", size, lambda: legacy_file_response(make_resource(), True))
+        resource = make_resource()
+        measure("after: resource file moved to spool", size, lambda: spooled_file_response(
+            browser, resource, os.path.join(workdir, "spooled")
+        ))
+
+        chunks = [payload[offset:offset + 65536] for offset in range(0, size, 65536)]
+        text_chunks = [chunk.decode("latin1") for chunk in chunks]
+        for kind, data in (("bytes", chunks), ("latin-1 str", text_chunks)):
+            print(f"List response of {len(data)} {kind} chunks")
+            measure("before: join (encoding str chunks)", size, lambda: legacy_list_response(data))
+            measure("after: preallocated buffer", size, lambda: browser._handle_list_response(data))
+            spool_path = os.path.join(workdir, "list")
+            measure("after: written to spool", size, lambda: browser._spool_to_file(data, spool_path))
+
+        print("Binary page preview")
+        measure("before: hex of whole payload", size, lambda: f"Binary data: {payload.hex()[:200]}...")
+        measure("after: hex of first 100 bytes", size, lambda: f"Binary data: {memoryview(payload)[:100].hex()}...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Measure full search index builds against the number of worker processes.
+
+Generates a synthetic page cache (node directories with an index page, a few
+extra pages and a node name, worded from a Zipf-like vocabulary so term
+frequencies look like real pages) and times `SearchIndex` full builds with
+each worker count, with and without writing the index to disk. Also reports how many bytes the shard segments take when
+pickled, which is what a worker process sends back to the parent.
+
+Worker processes cannot run faster than the CPUs available; the available
+count is printed first so the timings can be read against it.
+
+    python benchmarks/search_index.py --nodes 3000 --workers 1 2 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from rbrowser.search import SearchIndex, _build_segment, available_cpus  # noqa: E402
+
+
+def make_cache(cache_dir: Path, nodes: int, pages: int, words: int, seed: int) -> None:
+    rng = random.Random(seed)
+    vocabulary = [f"w{index:05d}" for index in range(words)]
+    weights = [1.0 / (rank + 1) for rank in range(words)]
+    for node in range(nodes):
+        node_dir = cache_dir / f"{node:032x}"
+        (node_dir / "pages").mkdir(parents=True)
+        (node_dir / "node_name.txt").write_text(f"Node {node} {rng.choice(vocabulary)}", encoding="utf-8")
+        for page in range(pages):
+            text = " ".join(rng.choices(vocabulary, weights, k=rng.randint(100, 600)))
+            target = node_dir / "index.mu" if page == 0 else node_dir / "pages" / f"p{page}.mu"
+            target.write_text(text, encoding="utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=3000, help="node directories to generate (default: 3000)")
+    parser.add_argument("--pages", type=int, default=4, help="pages per node (default: 4)")
+    parser.add_argument("--words", type=int, default=20000, help="vocabulary size (default: 20000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to time")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"CPUs available: {available_cpus()}")
+    with tempfile.TemporaryDirectory() as workdir:
+        cache_dir = Path(workdir) / "nodes"
+        started = time.perf_counter()
+        make_cache(cache_dir, args.nodes, args.pages, args.words, args.seed)
+        print(f"Generated {args.nodes} nodes x {args.pages} pages in {time.perf_counter() - started:.1f}s")
+
+        node_dirs = sorted(str(node_dir) for node_dir in cache_dir.iterdir())
+        shard = node_dirs[: max(1, len(node_dirs) // 4)]
+        segment_bytes = len(pickle.dumps(_build_segment(shard), protocol=pickle.HIGHEST_PROTOCOL))
+        print(f"Pickled segment for {len(shard)} nodes: {segment_bytes / 1048576:.1f} MiB")
+
+        for workers in args.workers:
+            index = SearchIndex(cache_dir, Path(workdir) / f"index-{workers}.msgpack")
+            started = time.perf_counter()
+            index._run_build(workers)
+            elapsed = time.perf_counter() - started
+            stats = index.stats()
+            print(
+                f"  requested {workers} worker(s), used {stats['workers']}: build {stats['duration']:6.2f}s, "
+                f"with save {elapsed:6.2f}s ({stats['nodes']} nodes, {stats['terms']} terms)"
+            )
+
+
+if __name__ == "__main__":
+    main()
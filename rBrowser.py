@@ -41,7 +41,11 @@ def create_app() -> Tuple[Flask, NomadNetWebBrowser]:
     return app, browser
 
 
-app, browser = create_app()
+# Search index builds always use the "spawn" start method, so every worker
+# re-imports this module as ``__mp_main__``; it must not bring up a second
+# browser instance.
+if __name__ != "__mp_main__":
+    app, browser = create_app()
 
 
 def start_server(flask_app: Flask, host: str = "0.0.0.0", port: int = 5000) -> None:
@@ -50,7 +54,9 @@ def start_server(flask_app: Flask, host: str = "0.0.0.0", port: int = 5000) -> N
         from waitress import serve
 
         print("🚀 Local Web Interface starting with Waitress server...")
-        serve(flask_app, host=host, port=port, threads=8)
+        # Open /api/events streams hold one thread each; routes.MAX_EVENT_STREAMS
+        # caps them so the rest stay free for API requests.
+        serve(flask_app, host=host, port=port, threads=16)
     except ImportError:
         logging.getLogger("werkzeug").setLevel(logging.ERROR)
         print("⚠️  Waitress not found, falling back to Flask dev server...")
@@ -63,6 +69,13 @@ def main() -> int:
     parser = argparse.ArgumentParser(description="rBrowser - Standalone NomadNet Browser")
     parser.add_argument("--host", type=str, default="0.0.0.0", help="Host to bind the web server to (default: 0.0.0.0)")
     parser.add_argument("--port", type=int, default=5000, help="Port to run the web server on (default: 5000)")
+    parser.add_argument("--reindex", action="store_true", help="Rebuild the cache search index from scratch at startup")
+    parser.add_argument(
+        "--index-workers",
+        type=int,
+        default=None,
+        help="Worker processes used to build the search index (default and maximum: the available CPUs)",
+    )
     args = parser.parse_args()
 
     try:
@@ -97,6 +110,12 @@ def main() -> int:
 
         browser.start_monitoring()
 
+        if args.reindex:
+            if browser.cache.search_index.rebuild(args.index_workers):
+                print("🔎 Full search re-index requested, building in the background...")
+            else:
+                print("⚠️ Full search re-index not started: a search index build is already running")
+
         host_display = "localhost" if args.host == "0.0.0.0" else args.host
         print(f"🌐 Starting local web server on http://{host_display}:{args.port}")
         print("📡 Listening for NomadNetwork announces...")
@@ -0,0 +1,340 @@
+"""
+Columnar log of received announces.
+
+Every accepted announce is stored as one row of four typed `array` columns
+(timestamp, node index, app_data length, hops) in a fixed-size ring buffer.
+Rows are periodically spilled to an append-only file so that analytics can
+reach further back than the in-memory window. Aggregations work on whole
+column slices with C-level primitives (`bisect`, `Counter`, `compress`,
+`sum`) instead of looping over events in Python.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import compress
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import RNS.vendor.umsgpack as msgpack
+
+
+# Hop counts that are not numbers are stored as this value.
+UNKNOWN_HOPS = 0xFFFF
+
+COLUMN_TYPES = (("ts", "d"), ("node", "I"), ("length", "I"), ("hops", "H"))
+
+# Columns for a run of rows: ts, node, length, hops.
+Columns = Tuple[array, array, array, array]
+
+
+def _empty_columns() -> Columns:
+    return tuple(array(typecode) for _, typecode in COLUMN_TYPES)  # type: ignore[return-value]
+
+
+def _window(columns: Columns, start: float, end: float) -> Columns:
+    """Slice rows with start <= ts < end (the ts column is ascending)."""
+    lo = bisect_left(columns[0], start)
+    hi = bisect_left(columns[0], end)
+    return tuple(column[lo:hi] for column in columns)  # type: ignore[return-value]
+
+
+class AnnounceLog:
+    """Ring buffer of announce rows with disk spill and window analytics."""
+
+    def __init__(
+        self,
+        spill_path: Path,
+        capacity: int = 100_000,
+        spill_interval: float = 60.0,
+        max_spill_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.spill_path = Path(spill_path)
+        self.capacity = capacity
+        self.spill_interval = spill_interval
+        self.max_spill_bytes = max_spill_bytes
+
+        self._columns: Columns = tuple(
+            array(typecode, bytes(array(typecode).itemsize * capacity)) for _, typecode in COLUMN_TYPES
+        )  # type: ignore[assignment]
+        self._head = 0
+        self._count = 0
+        self._total = 0
+        self._spilled = 0
+        self._lost = 0
+
+        self._node_ids: Dict[str, int] = {}
+        self._node_hashes: List[str] = []
+        self._spilled_nodes = 0
+
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle                                                          #
+    # ------------------------------------------------------------------ #
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def load(self) -> int:
+        """Restore the node index and the most recent rows from the spill file."""
+        rows = 0
+        recent: List[Columns] = []
+        for chunk in self._read_chunks(self.spill_path):
+            self._register_hashes(chunk["base"], chunk["hashes"])
+            columns = self._decode_columns(chunk)
+            recent.append(columns)
+            rows += len(columns[0])
+            # Only the newest `capacity` rows fit the ring.
+            while recent and rows - len(recent[0][0]) >= self.capacity:
+                rows -= len(recent.pop(0)[0])
+
+        combined = _empty_columns()
+        for columns in recent:
+            for target, column in zip(combined, columns):
+                target.extend(column)
+
+        with self._lock:
+            rows = min(len(combined[0]), self.capacity)
+            for ring, column in zip(self._columns, combined):
+                ring[:rows] = column[len(column) - rows:]
+            self._head = rows % self.capacity
+            self._count = self._total = self._spilled = rows
+            self._spilled_nodes = len(self._node_hashes)
+        return rows
+
+    def record(self, node_hash: str, timestamp: float, app_data_length: int, hops: Any) -> None:
+        """Append one announce; cheap enough for the Reticulum thread."""
+        with self._lock:
+            node_id = self._node_ids.get(node_hash)
+            if node_id is None:
+                node_id = self._node_ids[node_hash] = len(self._node_hashes)
+                self._node_hashes.append(node_hash)
+            hops_value = hops if isinstance(hops, int) and 0 <= hops < UNKNOWN_HOPS else UNKNOWN_HOPS
+            self._write_row(timestamp, node_id, min(app_data_length, 0xFFFFFFFF), hops_value)
+            pending = self._total - self._spilled
+        if pending >= self.capacity // 2:
+            self._wake.set()
+
+    def spill(self) -> int:
+        """Append rows not yet on disk to the spill file; returns the row count."""
+        with self._spill_lock:
+            with self._lock:
+                pending = self._total - self._spilled
+                if pending <= 0:
+                    return 0
+                if pending > self._count:
+                    self._lost += pending - self._count
+                    pending = self._count
+                columns = tuple(column[-pending:] for column in self._linear())
+                known = len(self._node_hashes)
+                base = self._spilled_nodes
+                hashes = self._node_hashes[base:known]
+                total = self._total
+
+            if self.spill_path.exists() and self.spill_path.stat().st_size > self.max_spill_bytes:
+                # Start a new file; its first chunk restates the whole node index.
+                os.replace(self.spill_path, self.spill_path.with_suffix(".old"))
+                base = 0
+                hashes = self._node_hashes[:known]
+
+            chunk = {
+                "t0": columns[0][0],
+                "t1": columns[0][-1],
+                "base": base,
+                "hashes": hashes,
+            }
+            for (name, _), column in zip(COLUMN_TYPES, columns):
+                chunk[name] = column.tobytes()
+
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.spill_path.open("ab") as handle:
+                handle.write(msgpack.packb(chunk))
+
+            with self._lock:
+                self._spilled = total
+                self._spilled_nodes = base + len(hashes)
+            return len(columns[0])
+
+    # ------------------------------------------------------------------ #
+    # Analytics                                                          #
+    # ------------------------------------------------------------------ #
+
+    def analytics(
+        self,
+        start: float,
+        end: float,
+        buckets: int = 60,
+        top: int = 10,
+        node_hash: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Rates, histograms and top talkers for announces in [start, end)."""
+        ts, nodes, lengths, hops = self._rows_between(start, end)
+        span = max(end - start, 1e-9)
+
+        node_id = None
+        if node_hash is not None:
+            with self._lock:
+                node_id = self._node_ids.get(node_hash)
+            if node_id is None:
+                ts, nodes, lengths, hops = _empty_columns()
+            else:
+                mask = bytes(map(node_id.__eq__, nodes))
+                ts = array("d", compress(ts, mask))
+                lengths = array("I", compress(lengths, mask))
+                hops = array("H", compress(hops, mask))
+                nodes = array("I", compress(nodes, mask))
+
+        total = len(ts)
+        bucket_seconds = span / max(buckets, 1)
+        edges = [start + bucket_seconds * index for index in range(max(buckets, 1) + 1)]
+        positions = [bisect_left(ts, edge) for edge in edges]
+        histogram = [later - earlier for earlier, later in zip(positions, positions[1:])]
+
+        hop_counts = Counter(hops)
+        result: Dict[str, Any] = {
+            "start": start,
+            "end": end,
+            "total": total,
+            "rate_per_minute": round(total * 60 / span, 3),
+            "histogram": {"bucket_seconds": round(bucket_seconds, 3), "counts": histogram},
+            "hops": {
+                ("unknown" if value == UNKNOWN_HOPS else str(value)): count
+                for value, count in sorted(hop_counts.items())
+            },
+            "app_data": {
+                "total_bytes": sum(lengths),
+                "average_bytes": round(sum(lengths) / total, 1) if total else 0,
+            },
+        }
+
+        if node_hash is not None:
+            result["node"] = node_hash
+            return result
+
+        per_node = Counter(nodes)
+        # Distinct (node, hops) pairs: a node seen at several hop counts in
+        # the window is changing routes.
+        hop_variants = Counter(map(itemgetter(0), set(zip(nodes, hops))))
+        with self._lock:
+            hashes = list(self._node_hashes)
+
+        result["unique_nodes"] = len(per_node)
+        result["top_talkers"] = [
+            {"hash": hashes[node], "count": count, "rate_per_hour": round(count * 3600 / span, 3)}
+            for node, count in per_node.most_common(top)
+        ]
+        result["flapping"] = [
+            {"hash": hashes[node], "hop_counts": variants, "count": per_node[node]}
+            for node, variants in hop_variants.most_common(top)
+            if variants > 1
+        ]
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rows_in_memory": self._count,
+                "capacity": self.capacity,
+                "total_recorded": self._total,
+                "spilled": self._spilled,
+                "lost": self._lost,
+                "known_nodes": len(self._node_hashes),
+                "oldest_in_memory": self._linear_oldest(),
+                "memory_bytes": sum(column.itemsize * len(column) for column in self._columns),
+            }
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.spill_interval)
+            self._wake.clear()
+            try:
+                self.spill()
+            except Exception as exc:
+                print(f"❌ Failed to spill announce log: {exc}")
+
+    def _write_row(self, timestamp: float, node_id: int, length: int, hops: int) -> None:
+        head = self._head
+        for column, value in zip(self._columns, (timestamp, node_id, length, hops)):
+            column[head] = value
+        self._head = (head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self._total += 1
+
+    def _linear(self) -> Columns:
+        """Copy the ring's rows in arrival order (caller holds the lock)."""
+        if self._count < self.capacity:
+            return tuple(column[: self._count] for column in self._columns)  # type: ignore[return-value]
+        head = self._head
+        return tuple(column[head:] + column[:head] for column in self._columns)  # type: ignore[return-value]
+
+    def _rows_between(self, start: float, end: float) -> Columns:
+        with self._lock:
+            memory = _window(self._linear(), start, end)
+            oldest = self._linear_oldest()
+
+        if oldest is None or start >= oldest:
+            return memory
+
+        # The window reaches past the ring; older rows come from disk.
+        combined = _empty_columns()
+        disk_end = min(end, oldest)
+        for path in (self.spill_path.with_suffix(".old"), self.spill_path):
+            for chunk in self._read_chunks(path):
+                if chunk["t1"] < start or chunk["t0"] >= disk_end:
+                    continue
+                for target, column in zip(combined, _window(self._decode_columns(chunk), start, disk_end)):
+                    target.extend(column)
+        for target, column in zip(combined, memory):
+            target.extend(column)
+        return combined
+
+    def _linear_oldest(self) -> Optional[float]:
+        if not self._count:
+            return None
+        return self._columns[0][self._head if self._count == self.capacity else 0]
+
+    def _register_hashes(self, base: int, hashes: List[str]) -> None:
+        for offset, node_hash in enumerate(hashes):
+            node_id = base + offset
+            if node_id == len(self._node_hashes):
+                self._node_hashes.append(node_hash)
+                self._node_ids[node_hash] = node_id
+
+    @staticmethod
+    def _decode_columns(chunk: Dict[str, Any]) -> Columns:
+        columns = _empty_columns()
+        for (name, _), column in zip(COLUMN_TYPES, columns):
+            column.frombytes(chunk[name])
+        return columns
+
+    @staticmethod
+    def _read_chunks(path: Path):
+        if not path.exists():
+            return
+        with path.open("rb") as handle:
+            while True:
+                try:
+                    chunk = msgpack.unpack(handle)
+                except msgpack.UnpackException:
+                    # End of file, or a chunk cut short by a crash.
+                    return
+                if isinstance(chunk, dict):
+                    yield chunk
+
+
+__all__ = ["AnnounceLog"]
@@ -0,0 +1,172 @@
+"""
+Bandwidth budget for background mesh traffic.
+
+Auto-caching used to fetch pages as fast as its queues drained, which on a
+shared LoRa interface takes airtime from interactive browsing and from other
+users of the mesh. `BandwidthBudget` holds token buckets for the background
+traffic as a whole and for individual Reticulum interfaces; background
+workers wait for both before each request and are charged for what they
+actually received afterwards.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Mapping, Optional
+
+
+# Seconds of traffic a bucket may save up while idle.
+BURST_SECONDS = 30.0
+
+# Smallest burst, so a single page always fits a slow budget eventually.
+MIN_BURST_BYTES = 4096
+
+# Charged before a request for link setup and the request itself; the
+# response is charged once its size is known.
+REQUEST_OVERHEAD_BYTES = 512
+
+# Longest single sleep, so budget changes take effect promptly.
+MAX_WAIT_SLICE = 1.0
+
+
+def _interface_key(interface: str) -> str:
+    """Interface labels come from path info as "via <name>"."""
+    return interface[4:] if interface.startswith("via ") else interface
+
+
+class TokenBucket:
+    """Byte budget refilled at `rate` bytes per second; may run into debt."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.burst = max(rate * BURST_SECONDS, MIN_BURST_BYTES)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+
+        self.bytes_used = 0
+        self.requests = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until the bucket is out of debt."""
+        self.refill(now)
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def charge(self, count: int) -> None:
+        self.tokens -= count
+        self.bytes_used += count
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "rate_bytes_per_second": self.rate,
+            "burst_bytes": int(self.burst),
+            "available_bytes": int(self.tokens),
+            "bytes_used": self.bytes_used,
+            "requests": self.requests,
+            "waits": self.waits,
+            "wait_seconds": round(self.wait_seconds, 3),
+        }
+
+
+class BandwidthBudget:
+    """Overall and per-interface token buckets for background requests."""
+
+    def __init__(self) -> None:
+        self._overall: Optional[TokenBucket] = None
+        self._interfaces: Dict[str, TokenBucket] = {}
+        # interface -> {"requests", "bytes"}, kept whether or not it is limited
+        self._usage: Dict[str, Dict[str, int]] = {}
+        self._condition = threading.Condition()
+
+    def configure(self, overall_rate: float, interface_rates: Mapping[str, float]) -> None:
+        """Apply new rates in bytes per second; a negative rate means unlimited."""
+        with self._condition:
+            self._overall = self._rebuild(self._overall, overall_rate)
+            interfaces = {}
+            for name, rate in interface_rates.items():
+                bucket = self._rebuild(self._interfaces.get(_interface_key(name)), rate)
+                if bucket is not None:
+                    interfaces[_interface_key(name)] = bucket
+            self._interfaces = interfaces
+            self._condition.notify_all()
+
+    def acquire(self, interface: str) -> float:
+        """
+        Block until the overall and interface budgets allow a request.
+
+        Returns the seconds spent waiting. The request overhead is charged
+        straight away; call `charge` with the response size when it arrives.
+        """
+        key = _interface_key(interface)
+        waited = 0.0
+        with self._condition:
+            while True:
+                buckets = self._buckets_locked(key)
+                now = time.monotonic()
+                delay = max((bucket.delay(now) for bucket in buckets), default=0.0)
+                if delay <= 0:
+                    break
+                started = time.monotonic()
+                self._condition.wait(min(delay, MAX_WAIT_SLICE))
+                waited += time.monotonic() - started
+
+            for bucket in buckets:
+                bucket.requests += 1
+                bucket.charge(REQUEST_OVERHEAD_BYTES)
+                if waited:
+                    bucket.waits += 1
+                    bucket.wait_seconds += waited
+            usage = self._usage.setdefault(key, {"requests": 0, "bytes": 0})
+            usage["requests"] += 1
+            usage["bytes"] += REQUEST_OVERHEAD_BYTES
+        return waited
+
+    def charge(self, interface: str, count: int) -> None:
+        """Record `count` bytes received for a background request."""
+        key = _interface_key(interface)
+        with self._condition:
+            for bucket in self._buckets_locked(key):
+                bucket.charge(count)
+            self._usage.setdefault(key, {"requests": 0, "bytes": 0})["bytes"] += count
+
+    def report(self) -> Dict[str, Any]:
+        with self._condition:
+            now = time.monotonic()
+            for bucket in self._buckets_locked(None):
+                bucket.refill(now)
+            return {
+                "overall": self._overall.report() if self._overall else None,
+                "interfaces": {name: bucket.report() for name, bucket in sorted(self._interfaces.items())},
+                "usage": {name: dict(usage) for name, usage in sorted(self._usage.items())},
+            }
+
+    def _buckets_locked(self, key: Optional[str]):
+        buckets = [self._overall] if self._overall is not None else []
+        if key is None:
+            buckets.extend(self._interfaces.values())
+        elif key in self._interfaces:
+            buckets.append(self._interfaces[key])
+        return buckets
+
+    @staticmethod
+    def _rebuild(bucket: Optional[TokenBucket], rate: float) -> Optional[TokenBucket]:
+        if rate is None or rate < 0:
+            return None
+        rate = max(float(rate), 1.0)
+        if bucket is None:
+            return TokenBucket(rate)
+        # Keep usage counters and current debt across a rate change.
+        bucket.refill(time.monotonic())
+        bucket.rate = rate
+        bucket.burst = max(rate * BURST_SECONDS, MIN_BURST_BYTES)
+        bucket.tokens = min(bucket.tokens, bucket.burst)
+        return bucket
+
+
+__all__ = ["BandwidthBudget", "TokenBucket"]
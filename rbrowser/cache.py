@@ -8,18 +8,34 @@ communication stacks.
 
 from __future__ import annotations
 
+import atexit
 import json
+import os
 import queue
+import re
+import shutil
 import threading
+import time
+import zipfile
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Iterable, Optional, Tuple
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 
+from .bandwidth import BandwidthBudget
+from .cache_stats import CacheStatistics, page_is_valid
 from .nomadnet import NomadNetBrowser
+from .search import SearchIndex, SearchResultCache
 
 
 CacheTask = Tuple[str, str, str]
 
+# Archive members accepted by `import_archive`: <node hash>/<file>.
+_IMPORT_NAME_RE = re.compile(r"^([0-9a-f]{32})/(index\.mu|node_name\.txt|cached_at\.txt|pages/[^\x00]+\.mu)$")
+_NODE_META_FILES = ("index.mu", "node_name.txt", "cached_at.txt")
+
+# Largest single page accepted from an imported archive.
+MAX_IMPORT_MEMBER_BYTES = 8 * 1024 * 1024
+
 
 class CacheManager:
     """Handle caching of NomadNet pages and related maintenance."""
@@ -30,6 +46,38 @@ class CacheManager:
         "expiry_days": 30,
         "search_limit": 50,
         "cache_additional": False,
+        # Node list limits; -1 disables a limit.
+        "node_max_count": 5000,
+        "node_max_age_days": 30,
+        # Downloaded files; revalidate refetches entries older than this
+        # many hours (-1 trusts cached files until they are evicted).
+        "file_cache_enabled": True,
+        "file_cache_size_mb": 500,
+        "file_cache_revalidate_hours": -1,
+        # Background fetch budget in bytes per second, overall and per
+        # interface name (as in "via <name>"); -1 means unlimited.
+        "background_bandwidth_bps": -1,
+        "background_bandwidth_interfaces": {},
+        # Speculative fetches of links on the page being read: how many per
+        # page, and how many unused prefetched pages a node may hold.
+        "prefetch_enabled": False,
+        "prefetch_links": 3,
+        "prefetch_node_budget": 6,
+        # Path requests (and optionally open links) for favorites and the
+        # most recently visited nodes; the pool caps links kept open.
+        "prewarm_enabled": True,
+        "prewarm_links": False,
+        "prewarm_recent": 10,
+        "link_pool_size": 16,
+        # Background link probes for /api/reachability, of the favorites
+        # and recently opened nodes, at most this many of them.
+        "reachability_enabled": True,
+        "reachability_interval_minutes": 30,
+        "reachability_concurrency": 2,
+        "reachability_max_nodes": 50,
+        # "off", "on" (never touch the network) or "auto" (serve the cache
+        # when the network is down or a node is unreachable).
+        "offline_mode": "auto",
     }
 
     ADDITIONAL_PAGES = [
@@ -55,10 +103,20 @@ class CacheManager:
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
         self.settings: Dict[str, object] = dict(self.DEFAULT_SETTINGS)
+        # Bumped on every write or eviction so derived data (search results,
+        # statistics) can tell whether the on-disk cache actually changed.
+        self.generation = 0
+        self._generation_lock = threading.Lock()
+        self.search_results = SearchResultCache()
+        self.search_index = SearchIndex(self.cache_dir, self.cache_dir.parent / "search_index.msgpack")
+        self.statistics = CacheStatistics(self.cache_dir, self.cache_dir.parent / "cache_stats.json")
+
         self.cache_queue: "queue.Queue[CacheTask]" = queue.Queue()
         self.additional_cache_queue: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+        self.bandwidth = BandwidthBudget()
 
         self._load_settings()
+        self.apply_bandwidth_settings()
 
         self.cache_worker_thread = threading.Thread(target=self._cache_worker, daemon=True)
         self.cache_worker_thread.start()
@@ -71,6 +129,10 @@ class CacheManager:
 
         print("✅ Cache worker threads started")
 
+        self.search_index.start()
+        self.statistics.start()
+        atexit.register(self.save_state, 0)
+
     # ------------------------------------------------------------------ #
     # Public API                                                         #
     # ------------------------------------------------------------------ #
@@ -131,6 +193,54 @@ class CacheManager:
         """Queue a node for caching additional pages."""
         self.additional_cache_queue.put((node_hash, node_name))
 
+    def save_state(self, min_interval: float = 60) -> None:
+        """Write the search index and cache statistics back if they changed."""
+        self.search_index.save_if_dirty(min_interval)
+        self.statistics.save_if_dirty(min_interval)
+
+    def page_file(self, node_hash: str, page_path: str) -> Path:
+        """Where a page is stored in the cache (see `cache_single_page`)."""
+        node_dir = self.cache_dir / node_hash
+        if page_path == "/page/index.mu":
+            return node_dir / "index.mu"
+        return node_dir / "pages" / (page_path.replace("/page/", "").replace(".mu", "") + ".mu")
+
+    def read_cached_page(self, node_hash: str, page_path: str) -> Optional[Dict[str, object]]:
+        """Cached content of a page and when it was cached, or None."""
+        page_file = self.page_file(node_hash, page_path)
+        try:
+            content = page_file.read_text(encoding="utf-8", errors="replace")
+        except (OSError, ValueError):
+            return None
+        if not content.strip() or not page_is_valid(content):
+            return None
+
+        cached_at_file = self.cache_dir / node_hash / "cached_at.txt"
+        if page_path == "/page/index.mu" and cached_at_file.exists():
+            cached_at = cached_at_file.read_text(encoding="utf-8").strip()
+        else:
+            cached_at = str(datetime.fromtimestamp(page_file.stat().st_mtime))
+        return {"content": content, "cached_at": cached_at}
+
+    def apply_bandwidth_settings(self) -> None:
+        """Push the background bandwidth settings into the budget."""
+        self.bandwidth.configure(
+            float(self.settings.get("background_bandwidth_bps", -1)),
+            dict(self.settings.get("background_bandwidth_interfaces") or {}),
+        )
+
+    def fetch_background(self, node_hash: str, page_path: str) -> Dict[str, object]:
+        """Fetch a page for the cache within the bandwidth budget, after user requests."""
+        if self.browser.is_offline():
+            return {"error": "Offline", "content": "", "status": "error"}
+        interface = self.browser.node_interface(node_hash)
+        self.bandwidth.acquire(interface)
+        with self.browser.priority.background(node_hash, interface):
+            response = NomadNetBrowser(self.browser, node_hash).fetch_page(page_path)
+        content = response.get("content") or ""
+        self.bandwidth.charge(interface, len(content.encode("utf-8", errors="replace")))
+        return response
+
     def save_settings(self) -> None:
         """Persist cache settings to disk."""
         settings_dir = Path("settings")
@@ -148,6 +258,77 @@ class CacheManager:
 
             shutil.rmtree(self.cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.search_index.clear()
+        self.statistics.clear()
+        self._bump_generation()
+
+    def export_files(self, since: Optional[float] = None) -> Iterator[Tuple[Path, str]]:
+        """
+        Yield (file, archive name) pairs for an export of the cache.
+
+        With `since` (epoch seconds) only nodes with files modified at or
+        after that time are included, with just those files plus the node's
+        name and timestamp so the receiving side can merge them.
+        """
+        for node_dir in self.iter_cached_nodes():
+            files = [file for file in node_dir.rglob("*") if file.is_file()]
+            if since is not None:
+                changed = [file for file in files if file.stat().st_mtime >= since]
+                if not changed:
+                    continue
+                meta = {node_dir / "node_name.txt", node_dir / "cached_at.txt"}
+                files = [file for file in files if file in meta or file in changed]
+            for file in files:
+                yield file, file.relative_to(self.cache_dir).as_posix()
+
+    def import_archive(self, archive_path: Path) -> Dict[str, int]:
+        """
+        Merge a cache export into this cache, keeping whichever copy is newer.
+
+        A node's index page, name and timestamp are taken when the archive's
+        `cached_at.txt` is newer than the local one; other pages when their
+        archive timestamp is newer than the local file. Members outside the
+        cache layout are rejected.
+        """
+        result = {"nodes": 0, "written": 0, "skipped": 0, "rejected": 0}
+        with zipfile.ZipFile(archive_path) as archive:
+            by_node: Dict[str, Dict[str, zipfile.ZipInfo]] = {}
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                match = _IMPORT_NAME_RE.match(info.filename)
+                if not match or ".." in info.filename.split("/") or info.file_size > MAX_IMPORT_MEMBER_BYTES:
+                    result["rejected"] += 1
+                    continue
+                by_node.setdefault(match.group(1), {})[match.group(2)] = info
+
+            for node_hash, members in by_node.items():
+                node_dir = self.cache_dir / node_hash
+                take_meta = self._archive_is_newer(archive, members.get("cached_at.txt"), node_dir / "cached_at.txt")
+                written = 0
+                for name, info in members.items():
+                    target = node_dir / name
+                    if name in _NODE_META_FILES:
+                        newer = take_meta
+                    else:
+                        newer = not target.exists() or _zip_mtime(info) > target.stat().st_mtime
+                    if not newer:
+                        result["skipped"] += 1
+                        continue
+                    self._extract_member(archive, info, target)
+                    if name.endswith(".mu"):
+                        self.statistics.record_page(node_hash, name)
+                    else:
+                        self.statistics.add_node(node_hash)
+                    written += 1
+
+                if written:
+                    result["nodes"] += 1
+                    result["written"] += written
+                    self._node_changed(node_hash)
+
+        self.enforce_size_limit()
+        return result
 
     def iter_cached_nodes(self) -> Iterable[Path]:
         """Yield all node cache directories."""
@@ -192,6 +373,7 @@ class CacheManager:
                 import shutil
 
                 shutil.rmtree(entry["path"])
+                self._node_removed(entry["path"].name)
                 total_size -= entry["size"]
                 print(f"🗑️ Removed old cache: {entry['path'].name} ({entry['size'] // 1024} KB)")
             except Exception as exc:
@@ -222,6 +404,7 @@ class CacheManager:
                     import shutil
 
                     shutil.rmtree(node_dir)
+                    self._node_removed(node_dir.name)
                     removed_count += 1
                     print(f"🗑️ Expired cache removed: {node_dir.name}")
                 except Exception as exc:
@@ -239,12 +422,12 @@ class CacheManager:
         print(f"📑 Starting additional page caching for {node_name}...")
         cache_dir = self.cache_dir / node_hash
         cache_dir.mkdir(parents=True, exist_ok=True)
+        self.statistics.add_node(node_hash)
 
         for page_path in self.ADDITIONAL_PAGES:
             try:
                 print(f"📄 Trying to cache: {page_path}")
-                browser = NomadNetBrowser(self.browser, node_hash)
-                response = browser.fetch_page(page_path)
+                response = self.fetch_background(node_hash, page_path)
 
                 if response["status"] != "success" or not response["content"].strip():
                     print(f"⚠️ Additional page not found or empty: {page_path}")
@@ -256,6 +439,8 @@ class CacheManager:
                 filename = page_path.replace("/page/", "").replace(".mu", "") + ".mu"
                 page_file = pages_dir / filename
                 page_file.write_text(response["content"], encoding="utf-8")
+                self.statistics.record_page(node_hash, f"pages/{filename}", response["content"])
+                self._node_changed(node_hash)
                 print(f"📄 Cached additional page: {page_path}")
 
             except Exception as exc:
@@ -265,6 +450,24 @@ class CacheManager:
     # Internal helpers                                                   #
     # ------------------------------------------------------------------ #
 
+    def _bump_generation(self) -> None:
+        """Record that the on-disk cache has changed."""
+        with self._generation_lock:
+            self.generation += 1
+
+    def _node_changed(self, node_hash: str) -> None:
+        """Propagate a write to a node's cached pages."""
+        self.search_index.update_node(node_hash)
+        self._bump_generation()
+        self.browser.events.publish("cache", {"node_hash": node_hash, "action": "updated"})
+
+    def _node_removed(self, node_hash: str) -> None:
+        """Propagate the eviction of a node's cache directory."""
+        self.search_index.remove_node(node_hash)
+        self.statistics.remove_node(node_hash)
+        self._bump_generation()
+        self.browser.events.publish("cache", {"node_hash": node_hash, "action": "removed"})
+
     def _cache_worker(self) -> None:
         """Process the cache queue in the background."""
         while True:
@@ -273,9 +476,12 @@ class CacheManager:
                 self.cache_single_page(node_hash, node_name, page_path)
                 self.cache_queue.task_done()
             except queue.Empty:
-                continue
+                pass
             except Exception as exc:
                 print(f"Cache worker error: {exc}")
+            # Rate-limited by the saves themselves, so a queue that never
+            # drains still gets its index and totals written back.
+            self.save_state()
 
     def _additional_cache_worker(self) -> None:
         print("🔧 Additional cache worker started")
@@ -297,8 +503,7 @@ class CacheManager:
             print(f"🔧 Additional caching setting: {self.settings.get('cache_additional', False)}")
             print(f"🔧 Page path: {page_path}")
 
-            browser = NomadNetBrowser(self.browser, node_hash)
-            response = browser.fetch_page(page_path)
+            response = self.fetch_background(node_hash, page_path)
             print(f"📋 Response status: {response['status']}")
 
             if response["status"] != "success":
@@ -307,6 +512,7 @@ class CacheManager:
 
             cache_dir = self.cache_dir / node_hash
             cache_dir.mkdir(parents=True, exist_ok=True)
+            self.statistics.add_node(node_hash)
             print(f"📂 Created cache directory: {cache_dir}")
 
             self._write_cache_files(cache_dir, node_name, response["content"])
@@ -344,6 +550,35 @@ class CacheManager:
             (cache_dir / "cached_at.txt").write_text(str(datetime.now()), encoding="utf-8")
             print(f"✅ Successfully cached page from {safe_name} (with character replacements)")
 
+        # Only reached once a write succeeded; a failed write propagates.
+        self.statistics.record_page(cache_dir.name, "index.mu", content)
+        self._node_changed(cache_dir.name)
+
+    @staticmethod
+    def _archive_is_newer(archive: zipfile.ZipFile, info: Optional[zipfile.ZipInfo], local: Path) -> bool:
+        if info is None:
+            return not local.exists()
+        if not local.exists():
+            return True
+        try:
+            incoming = datetime.fromisoformat(archive.read(info).decode("utf-8").strip())
+            current = datetime.fromisoformat(local.read_text(encoding="utf-8").strip())
+        except ValueError:
+            return _zip_mtime(info) > local.stat().st_mtime
+        return incoming > current
+
+    @staticmethod
+    def _extract_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path) -> None:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + ".import")
+        with archive.open(info) as source, tmp_path.open("wb") as handle:
+            shutil.copyfileobj(source, handle)
+        # Keep the exporter's timestamp so later incremental exports compare
+        # like with like.
+        mtime = _zip_mtime(info)
+        os.utime(tmp_path, (mtime, mtime))
+        os.replace(tmp_path, target)
+
     def _load_settings(self) -> None:
         settings_dir = Path("settings")
         settings_dir.mkdir(exist_ok=True)
@@ -359,6 +594,10 @@ class CacheManager:
                 print(f"Error loading cache settings: {exc}")
 
 
+def _zip_mtime(info: zipfile.ZipInfo) -> float:
+    return time.mktime(info.date_time + (0, 0, -1))
+
+
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:  # pragma: no cover
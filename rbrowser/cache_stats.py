@@ -0,0 +1,240 @@
+"""
+Running totals for the page cache.
+
+`/api/cache-stats` used to walk every node directory and read every page to
+count the ones that hold a real page rather than an error. `CacheStatistics`
+keeps per-page size and validity instead, recorded once when the page is
+written and dropped when its node is evicted, so the totals are always at
+hand. The table is saved next to the cache; at startup it is checked against
+the directory listing and only pages whose size or timestamp changed are
+read again.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+STATS_FORMAT_VERSION = 1
+
+# Error text the fetch path stores in place of a page that could not be loaded.
+FAILED_MARKER = "Request failed"
+
+
+def page_is_valid(content: str) -> bool:
+    """Whether cached page content is a real page rather than a failed request."""
+    return FAILED_MARKER not in content
+
+
+class CacheStatistics:
+    """Node, page and byte counts of the page cache, maintained incrementally."""
+
+    def __init__(self, cache_dir: Path, state_path: Path) -> None:
+        self.cache_dir = cache_dir
+        self.state_path = state_path
+
+        # node -> page path relative to the node dir -> [size, mtime, valid];
+        # node directories without pages keep an empty entry, so every node
+        # directory counts towards `node_count`.
+        self._pages: Dict[str, Dict[str, List[Any]]] = {}
+        self.page_count = 0
+        self.valid_page_count = 0
+        self.total_size = 0
+
+        self._lock = threading.Lock()
+        self._touched: Set[str] = set()
+        self._scanning = False
+        self._dirty = False
+        self._last_save = 0.0
+        # Serialises writers, so the exit-time save waits for one in progress.
+        self._save_lock = threading.Lock()
+        self.ready = False
+
+    def start(self) -> None:
+        """Load the saved table and reconcile it with the disk in the background."""
+        threading.Thread(target=self._startup, daemon=True).start()
+
+    # ------------------------------------------------------------------ #
+    # Incremental maintenance                                            #
+    # ------------------------------------------------------------------ #
+
+    def record_page(self, node_hash: str, relative: str, content: Optional[str] = None) -> None:
+        """Account for a page just written; `content` saves reading it back."""
+        path = self.cache_dir / node_hash / relative
+        try:
+            stat = path.stat()
+            if content is None:
+                content = path.read_text(encoding="utf-8", errors="ignore")
+        except OSError:
+            return
+        with self._lock:
+            self._set_page_locked(node_hash, relative, [stat.st_size, stat.st_mtime, page_is_valid(content)])
+            self._touched.add(node_hash)
+            self._dirty = True
+
+    def add_node(self, node_hash: str) -> None:
+        """Account for a node directory just created, before any page is written."""
+        with self._lock:
+            if node_hash not in self._pages:
+                self._pages[node_hash] = {}
+                self._touched.add(node_hash)
+                self._dirty = True
+
+    def remove_node(self, node_hash: str) -> None:
+        with self._lock:
+            self._remove_node_locked(node_hash)
+            self._touched.add(node_hash)
+            self._dirty = True
+
+    def clear(self) -> None:
+        with self._lock:
+            # Everything on disk before the clear is gone; a running scan
+            # must not bring it back.
+            self._touched.update(self._pages)
+            self._pages = {}
+            self.page_count = self.valid_page_count = self.total_size = 0
+            self._dirty = True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "node_count": len(self._pages),
+                "page_count": self.page_count,
+                "valid_page_count": self.valid_page_count,
+                "total_size": self.total_size,
+                "ready": self.ready,
+            }
+
+    # ------------------------------------------------------------------ #
+    # Persistence                                                        #
+    # ------------------------------------------------------------------ #
+
+    def save(self) -> None:
+        with self._lock:
+            payload = {
+                "version": STATS_FORMAT_VERSION,
+                "nodes": {node: dict(pages) for node, pages in self._pages.items()},
+            }
+            self._dirty = False
+            self._last_save = time.time()
+
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle)
+        os.replace(tmp_path, self.state_path)
+
+    def save_if_dirty(self, min_interval: float = 60) -> None:
+        with self._save_lock:
+            if self._dirty and not self._scanning and time.time() - self._last_save >= min_interval:
+                try:
+                    self.save()
+                except Exception as exc:
+                    print(f"❌ Failed to save cache statistics: {exc}")
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers                                                   #
+    # ------------------------------------------------------------------ #
+
+    def _startup(self) -> None:
+        with self._lock:
+            self._scanning = True
+            self._touched.clear()
+        saved = self._load()
+        with self._lock:
+            for node_hash, pages in saved.items():
+                if node_hash in self._touched:
+                    continue
+                self._pages.setdefault(node_hash, {})
+                for relative, entry in pages.items():
+                    self._set_page_locked(node_hash, relative, entry)
+
+        started = time.time()
+        reread = 0
+        seen: Set[str] = set()
+        try:
+            for node_dir in self.cache_dir.iterdir() if self.cache_dir.exists() else []:
+                if not node_dir.is_dir():
+                    continue
+                seen.add(node_dir.name)
+                pages, count = self._scan_node(node_dir, saved.get(node_dir.name, {}))
+                reread += count
+                with self._lock:
+                    if node_dir.name in self._touched:
+                        continue
+                    self._remove_node_locked(node_dir.name)
+                    self._pages[node_dir.name] = {}
+                    for relative, entry in pages.items():
+                        self._set_page_locked(node_dir.name, relative, entry)
+
+            with self._lock:
+                for node_hash in [node for node in self._pages if node not in seen and node not in self._touched]:
+                    self._remove_node_locked(node_hash)
+                self._dirty = True
+                self.ready = True
+            print(
+                f"📊 Cache statistics ready: {self.page_count} pages, {reread} re-read "
+                f"({time.time() - started:.1f}s)"
+            )
+        except Exception as exc:
+            print(f"❌ Cache statistics scan failed: {exc}")
+        finally:
+            with self._lock:
+                self._scanning = False
+                self._touched.clear()
+        self.save_if_dirty(min_interval=0)
+
+    def _scan_node(self, node_dir: Path, known: Dict[str, List[Any]]) -> Tuple[Dict[str, List[Any]], int]:
+        """Entries for a node's pages, reusing `known` ones whose file is unchanged."""
+        pages: Dict[str, List[Any]] = {}
+        reread = 0
+        for file in node_dir.rglob("*.mu"):
+            try:
+                stat = file.stat()
+                relative = file.relative_to(node_dir).as_posix()
+                entry = known.get(relative)
+                if entry is None or entry[0] != stat.st_size or entry[1] != stat.st_mtime:
+                    content = file.read_text(encoding="utf-8", errors="ignore")
+                    entry = [stat.st_size, stat.st_mtime, page_is_valid(content)]
+                    reread += 1
+                pages[relative] = entry
+            except OSError as exc:
+                print(f"Error reading {file}: {exc}")
+        return pages, reread
+
+    def _load(self) -> Dict[str, Dict[str, List[Any]]]:
+        if not self.state_path.exists():
+            return {}
+        try:
+            with self.state_path.open("r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            if payload.get("version") == STATS_FORMAT_VERSION:
+                return payload.get("nodes", {})
+        except Exception as exc:
+            print(f"⚠️ Ignoring saved cache statistics: {exc}")
+        return {}
+
+    def _set_page_locked(self, node_hash: str, relative: str, entry: List[Any]) -> None:
+        pages = self._pages.setdefault(node_hash, {})
+        previous = pages.get(relative)
+        if previous is not None:
+            self._count_locked(previous, -1)
+        pages[relative] = entry
+        self._count_locked(entry, 1)
+
+    def _remove_node_locked(self, node_hash: str) -> None:
+        for entry in self._pages.pop(node_hash, {}).values():
+            self._count_locked(entry, -1)
+
+    def _count_locked(self, entry: List[Any], sign: int) -> None:
+        self.page_count += sign
+        self.total_size += sign * entry[0]
+        if entry[2]:
+            self.valid_page_count += sign
+
+
+__all__ = ["CacheStatistics", "page_is_valid"]
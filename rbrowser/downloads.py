@@ -0,0 +1,387 @@
+"""
+Download job management.
+
+File downloads used to run on one thread per request with their state kept in
+module-level dictionaries that were only cleaned up when a client collected
+the result. `DownloadManager` runs them on a fixed pool of workers with
+overall, per-node and per-interface concurrency limits, keeps job state
+behind a lock, reaps finished jobs after a TTL and persists job metadata so
+completed downloads survive a restart.
+
+Jobs are grouped by the next-hop interface of their node. Transfers over
+different interfaces run side by side while each interface only carries a
+few at once, and the measured throughput of every interface is tracked.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+
+ACTIVE_STATES = ("queued", "downloading")
+FINISHED_STATES = ("complete", "error", "cancelled")
+
+# Weight of the newest transfer in an interface's throughput estimate.
+THROUGHPUT_ALPHA = 0.3
+
+
+@dataclass
+class DownloadJob:
+    """State of one file download."""
+
+    id: str
+    node_hash: str
+    file_path: str
+    filename: str
+    status: str = "queued"
+    progress: float = 0.0
+    size: Optional[int] = None
+    error: Optional[str] = None
+    path: Optional[str] = None
+    interface: str = "Unknown"
+    use_cache: bool = True
+    cached: bool = False
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    served_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["download_id"] = data.pop("id")
+        data.pop("path")
+        return data
+
+
+class DownloadManager:
+    """Queue and run file downloads on a bounded pool of worker threads."""
+
+    def __init__(
+        self,
+        browser: "NomadNetWebBrowser",
+        spool_dir: Path,
+        workers: int = 4,
+        per_node: int = 2,
+        per_interface: int = 2,
+        max_queue: int = 256,
+        result_ttl: float = 600,
+        max_finished: int = 200,
+    ) -> None:
+        self.browser = browser
+        self.spool_dir = Path(spool_dir)
+        self.workers = workers
+        self.per_node = per_node
+        self.per_interface = per_interface
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self.max_finished = max_finished
+        self.state_path = self.spool_dir / "jobs.json"
+
+        self._jobs: "OrderedDict[str, DownloadJob]" = OrderedDict()
+        self._queue: Deque[str] = deque()
+        self._active_per_node: Dict[str, int] = {}
+        self._active_per_interface: Dict[str, int] = {}
+        # interface -> {"bytes_per_second", "samples", "updated_at"}
+        self._throughput: Dict[str, Dict[str, float]] = {}
+        self._active = 0
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._last_reap = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle                                                          #
+    # ------------------------------------------------------------------ #
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"download-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def load(self) -> int:
+        """
+        Restore job metadata from the previous run.
+
+        Completed jobs whose spool files still exist are kept until their TTL
+        runs out, interrupted jobs are queued again and stray spool files are
+        deleted.
+        """
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        jobs: List[DownloadJob] = []
+        if self.state_path.exists():
+            try:
+                with self.state_path.open("r") as handle:
+                    jobs = [DownloadJob(**entry) for entry in json.load(handle)]
+            except Exception as exc:
+                print(f"⚠️ Download jobs could not be restored: {exc}")
+
+        with self._condition:
+            for job in jobs:
+                if job.status == "complete" and not (job.path and os.path.exists(job.path)):
+                    continue
+                if job.status in ACTIVE_STATES:
+                    job.status, job.progress, job.started_at = "queued", 0.0, None
+                    self._queue.append(job.id)
+                self._jobs[job.id] = job
+
+            kept = {job.path for job in self._jobs.values() if job.path}
+            for spool_file in self.spool_dir.glob("*.part"):
+                if str(spool_file) not in kept:
+                    spool_file.unlink(missing_ok=True)
+
+            requeued = len(self._queue)
+            self._save()
+
+        if requeued:
+            print(f"📥 Re-queued {requeued} interrupted downloads")
+        return len(self._jobs)
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def submit(self, node_hash: str, file_path: str, use_cache: bool = True) -> Optional[DownloadJob]:
+        """Queue a download; returns None when the queue is full."""
+        job = DownloadJob(
+            id=str(uuid.uuid4()),
+            node_hash=node_hash,
+            file_path=file_path,
+            filename=file_path.split("/")[-1] or "download",
+            interface=self.browser.node_interface(node_hash),
+            use_cache=use_cache,
+        )
+        with self._condition:
+            self._reap_locked()
+            if len(self._queue) >= self.max_queue:
+                return None
+            self._jobs[job.id] = job
+            self._queue.append(job.id)
+            self._save()
+            self._condition.notify_all()
+        self._publish(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[DownloadJob]:
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def mark_served(self, job_id: str) -> Optional[DownloadJob]:
+        """Return a completed job and start its TTL from the first time it is served."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == "complete" and job.served_at is None:
+                job.served_at = time.time()
+                self._save()
+            return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job or forget a finished one."""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status == "downloading":
+                return False
+            if job.status == "queued":
+                self._queue.remove(job_id)
+                job.status, job.finished_at = "cancelled", time.time()
+            else:
+                self._forget(job)
+            self._save()
+        self._publish(job)
+        return True
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._condition:
+            self._reap_locked()
+            return [job.to_dict() for job in reversed(self._jobs.values())]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return {
+                "workers": self.workers,
+                "per_node": self.per_node,
+                "per_interface": self.per_interface,
+                "active": self._active,
+                "queued": len(self._queue),
+                "max_queue": self.max_queue,
+                "jobs": counts,
+                "result_ttl": self.result_ttl,
+                "interfaces": self._interface_stats_locked(),
+            }
+
+    def _interface_stats_locked(self) -> Dict[str, Dict[str, Any]]:
+        queued: Dict[str, int] = {}
+        for job_id in self._queue:
+            interface = self._jobs[job_id].interface
+            queued[interface] = queued.get(interface, 0) + 1
+
+        interfaces = set(queued) | set(self._active_per_interface) | set(self._throughput)
+        report = {}
+        for interface in sorted(interfaces):
+            estimate = self._throughput.get(interface, {})
+            report[interface] = {
+                "active": self._active_per_interface.get(interface, 0),
+                "queued": queued.get(interface, 0),
+                "bytes_per_second": round(estimate.get("bytes_per_second", 0.0), 1),
+                "samples": int(estimate.get("samples", 0)),
+                "updated_at": estimate.get("updated_at"),
+            }
+        return report
+
+    # ------------------------------------------------------------------ #
+    # Workers                                                            #
+    # ------------------------------------------------------------------ #
+
+    def _worker(self) -> None:
+        while True:
+            with self._condition:
+                job = self._next_job_locked()
+                while job is None:
+                    self._condition.wait(timeout=30)
+                    self._reap_locked()
+                    job = self._next_job_locked()
+                job.status, job.started_at = "downloading", time.time()
+                self._track_locked(job, 1)
+                self._save()
+
+            self._publish(job)
+            try:
+                self._run(job)
+            except Exception as exc:
+                print(f"❌ Download worker error: {exc}")
+                job.status, job.error = "error", str(exc)
+            finally:
+                with self._condition:
+                    job.finished_at = time.time()
+                    self._track_locked(job, -1)
+                    if job.status == "complete" and not job.cached:
+                        self._record_throughput_locked(job)
+                    self._save()
+                    self._condition.notify_all()
+                self._publish(job)
+
+    def _next_job_locked(self) -> Optional[DownloadJob]:
+        # Among queued jobs whose node and interface are under their limits,
+        # take the oldest one on the least busy interface, so a free worker
+        # goes to an idle interface before doubling up on a busy one.
+        chosen: Optional[DownloadJob] = None
+        chosen_load = 0
+        for job_id in self._queue:
+            job = self._jobs[job_id]
+            if self._active_per_node.get(job.node_hash, 0) >= self.per_node:
+                continue
+            load = self._active_per_interface.get(job.interface, 0)
+            if load >= self.per_interface:
+                continue
+            if chosen is None or load < chosen_load:
+                chosen, chosen_load = job, load
+                if not load:
+                    break
+        if chosen is not None:
+            self._queue.remove(chosen.id)
+        return chosen
+
+    def _track_locked(self, job: DownloadJob, delta: int) -> None:
+        self._active += delta
+        for counts, key in ((self._active_per_node, job.node_hash), (self._active_per_interface, job.interface)):
+            counts[key] = counts.get(key, 0) + delta
+            if not counts[key]:
+                del counts[key]
+
+    def _record_throughput_locked(self, job: DownloadJob) -> None:
+        elapsed = (job.finished_at or 0) - (job.started_at or 0)
+        if not job.size or elapsed <= 0:
+            return
+        rate = job.size / elapsed
+        estimate = self._throughput.setdefault(job.interface, {"bytes_per_second": rate, "samples": 0})
+        estimate["bytes_per_second"] += THROUGHPUT_ALPHA * (rate - estimate["bytes_per_second"])
+        estimate["samples"] += 1
+        estimate["updated_at"] = job.finished_at
+
+    def _run(self, job: DownloadJob) -> None:
+        spool_path = self.spool_dir / f"{job.id}.part"
+        last_published = [-1.0]
+
+        def progress_callback(progress: float) -> None:
+            job.progress = progress * 100
+            # Whole-percent steps are plenty for a progress bar.
+            if job.progress - last_published[0] >= 1:
+                last_published[0] = job.progress
+                self._publish(job)
+
+        response = self.browser.fetch_file(
+            job.node_hash, job.file_path, progress_callback, dest_path=str(spool_path), use_cache=job.use_cache
+        )
+        if response["status"] == "success":
+            job.path, job.size = str(spool_path), response["size"]
+            job.cached = response.get("cached", False)
+            job.status, job.progress = "complete", 100.0
+        else:
+            spool_path.unlink(missing_ok=True)
+            job.status, job.progress = "error", 0.0
+            job.error = response.get("error", "Unknown error")
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _reap_locked(self) -> None:
+        now = time.time()
+        if now - self._last_reap < 5:
+            return
+        self._last_reap = now
+
+        finished = [job for job in self._jobs.values() if job.status in FINISHED_STATES]
+        expired = [job for job in finished if now - (job.served_at or job.finished_at or now) >= self.result_ttl]
+        # Beyond the history cap the oldest finished jobs go first.
+        overflow = len(finished) - len(expired) - self.max_finished
+        if overflow > 0:
+            expired_ids = {job.id for job in expired}
+            expired += [job for job in finished if job.id not in expired_ids][:overflow]
+
+        for job in expired:
+            self._forget(job)
+        if expired:
+            self._save()
+
+    def _forget(self, job: DownloadJob) -> None:
+        self._jobs.pop(job.id, None)
+        if job.path:
+            Path(job.path).unlink(missing_ok=True)
+
+    def _save(self) -> None:
+        # Called on state transitions only, never per progress update.
+        try:
+            tmp_path = self.state_path.with_suffix(".tmp")
+            with tmp_path.open("w") as handle:
+                json.dump([asdict(job) for job in self._jobs.values()], handle)
+            os.replace(tmp_path, self.state_path)
+        except Exception as exc:
+            print(f"❌ Failed to save download jobs: {exc}")
+
+    def _publish(self, job: DownloadJob) -> None:
+        self.browser.events.publish(
+            "download",
+            {"download_id": job.id, "progress": job.progress, "status": job.status},
+        )
+
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .web_browser import NomadNetWebBrowser
+
+
+__all__ = ["DownloadJob", "DownloadManager"]
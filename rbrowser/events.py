@@ -0,0 +1,74 @@
+"""
+In-process event bus feeding the server-sent event stream.
+
+Announces, cache writes, download progress and connection state changes are
+published here once and fanned out to every connected `/api/events` client,
+so open tabs no longer have to poll each endpoint on a timer.
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import threading
+from typing import Any, Dict, Set, Tuple
+
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class EventBus:
+    """Fan-out of named events to bounded per-subscriber queues."""
+
+    def __init__(self, queue_size: int = 256) -> None:
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped = 0
+
+        self._subscribers: Set["queue.Queue[Event]"] = set()
+        self._lock = threading.Lock()
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Deliver an event to every subscriber without ever blocking."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+
+        for subscription in subscribers:
+            try:
+                subscription.put_nowait((event_type, data))
+            except queue.Full:
+                # A stalled client loses its oldest event rather than
+                # holding up the publisher (usually the RNS thread).
+                try:
+                    subscription.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    subscription.put_nowait((event_type, data))
+                except queue.Full:
+                    pass
+                with self._lock:
+                    self.dropped += 1
+
+    def subscribe(self) -> "queue.Queue[Event]":
+        subscription: "queue.Queue[Event]" = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: "queue.Queue[Event]") -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped}
+
+
+def format_sse(event_type: str, data: Dict[str, Any]) -> str:
+    """Encode one event in the text/event-stream wire format."""
+    return f"event: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+__all__ = ["EventBus", "format_sse"]
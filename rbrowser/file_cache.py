@@ -0,0 +1,251 @@
+"""
+Disk cache for files downloaded from NomadNet nodes.
+
+Entries are keyed on (node hash, file path) and point at content-addressed
+blobs named by their SHA-256, so the same file offered by several nodes or
+under several paths is stored once. The cache is bounded in bytes and
+evicts the least recently used entries; a blob is deleted once no entry
+refers to it. Files are moved in and out with hard links where the
+filesystem allows, so caching a download does not copy it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+HASH_CHUNK = 1024 * 1024
+
+# key -> {"sha256", "size", "fetched_at", "last_access"}
+Entry = Dict[str, Any]
+
+
+def _entry_key(node_hash: str, file_path: str) -> str:
+    return f"{node_hash}:{file_path}"
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+class FileCache:
+    """Size-bounded LRU cache of downloaded files, deduplicated by content."""
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.index_path = self.root / "index.json"
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[str, Entry]" = OrderedDict()
+        self._blob_refs: Dict[str, int] = {}
+        self._blob_sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Lookups only touch `last_access`; the index is written back lazily.
+        self._dirty = False
+        self._last_save = 0.0
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle                                                          #
+    # ------------------------------------------------------------------ #
+
+    def load(self) -> int:
+        """Read the index, dropping entries without blobs and unreferenced blobs."""
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        entries: Dict[str, Entry] = {}
+        if self.index_path.exists():
+            try:
+                with self.index_path.open("r") as handle:
+                    entries = json.load(handle)
+            except Exception as exc:
+                print(f"⚠️ File cache index could not be loaded: {exc}")
+
+        with self._lock:
+            for key, entry in sorted(entries.items(), key=lambda item: item[1]["last_access"]):
+                if self._blob_path(entry["sha256"]).exists():
+                    self._add_locked(key, entry)
+
+            for blob in self.blob_dir.glob("*/*"):
+                if blob.name not in self._blob_refs:
+                    blob.unlink(missing_ok=True)
+            self._evict_locked()
+            self._save_locked()
+        return len(self._entries)
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def lookup(self, node_hash: str, file_path: str, max_age: float = -1) -> Optional[Entry]:
+        """
+        Return the entry for a file if it is cached, counting a hit or miss.
+
+        Entries fetched more than `max_age` seconds ago (-1: never) count as
+        stale and are reported as misses so the caller revalidates them.
+        """
+        key = _entry_key(node_hash, file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (max_age >= 0 and time.time() - entry["fetched_at"] > max_age):
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry["last_access"] = time.time()
+            self._entries.move_to_end(key)
+            self._dirty = True
+            return dict(entry)
+
+    def materialize(self, entry: Entry, dest_path: str) -> None:
+        """Place a cached file at `dest_path` (a hard link when possible)."""
+        _link_or_copy(self._blob_path(entry["sha256"]), Path(dest_path))
+
+    def read(self, entry: Entry) -> bytes:
+        return self._blob_path(entry["sha256"]).read_bytes()
+
+    def store(self, node_hash: str, file_path: str, source_path: str) -> Entry:
+        """Add a downloaded file; the source file is left in place."""
+        digest = hashlib.sha256()
+        buffer = bytearray(HASH_CHUNK)
+        view = memoryview(buffer)
+        with open(source_path, "rb", buffering=0) as handle:
+            while True:
+                count = handle.readinto(buffer)
+                if not count:
+                    break
+                digest.update(view[:count])
+        sha256 = digest.hexdigest()
+        size = os.path.getsize(source_path)
+
+        now = time.time()
+        key = _entry_key(node_hash, file_path)
+        entry = {"sha256": sha256, "size": size, "fetched_at": now, "last_access": now}
+        with self._lock:
+            blob_path = self._blob_path(sha256)
+            if not blob_path.exists():
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                _link_or_copy(Path(source_path), blob_path)
+
+            # Release the old blob only after the new entry holds its own
+            # reference, so re-storing an unchanged file keeps the blob.
+            previous = self._entries.pop(key, None)
+            self._add_locked(key, entry)
+            if previous is not None:
+                self._release_locked(previous["sha256"])
+            self._evict_locked()
+            self._save_locked()
+        return dict(entry)
+
+    def store_bytes(self, node_hash: str, file_path: str, data: bytes) -> Entry:
+        self.root.mkdir(parents=True, exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as tmp:
+                tmp.write(data)
+            return self.store(node_hash, file_path, tmp_path)
+        finally:
+            os.unlink(tmp_path)
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict_locked()
+            self._save_locked()
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove_locked(key)
+            self._save_locked()
+
+    def save_if_dirty(self, min_interval: float = 60) -> None:
+        """Write back access times recorded by lookups since the last save."""
+        with self._lock:
+            if self._dirty and time.time() - self._last_save >= min_interval:
+                self._save_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stored = sum(self._blob_sizes.values())
+            logical = sum(entry["size"] for entry in self._entries.values())
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "blobs": len(self._blob_sizes),
+                "total_bytes": stored,
+                "max_bytes": self.max_bytes,
+                "deduplicated_bytes": logical - stored,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / sha256[:2] / sha256
+
+    def _add_locked(self, key: str, entry: Entry) -> None:
+        self._entries[key] = entry
+        sha256 = entry["sha256"]
+        self._blob_refs[sha256] = self._blob_refs.get(sha256, 0) + 1
+        self._blob_sizes[sha256] = entry["size"]
+
+    def _remove_locked(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._release_locked(entry["sha256"])
+
+    def _release_locked(self, sha256: str) -> None:
+        self._blob_refs[sha256] -= 1
+        if not self._blob_refs[sha256]:
+            del self._blob_refs[sha256]
+            del self._blob_sizes[sha256]
+            self._blob_path(sha256).unlink(missing_ok=True)
+
+    def _evict_locked(self) -> None:
+        if self.max_bytes < 0:
+            return
+        total = sum(self._blob_sizes.values())
+        while total > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            sha256 = self._entries[key]["sha256"]
+            size = self._blob_sizes[sha256]
+            last_reference = self._blob_refs[sha256] == 1
+            self._remove_locked(key)
+            self.evictions += 1
+            # Space is only freed once no other entry shares the blob.
+            if last_reference:
+                total -= size
+
+    def _save_locked(self) -> None:
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(".tmp")
+            with tmp_path.open("w") as handle:
+                json.dump(self._entries, handle)
+            os.replace(tmp_path, self.index_path)
+            self._dirty = False
+            self._last_save = time.time()
+        except Exception as exc:
+            print(f"❌ Failed to save file cache index: {exc}")
+
+
+__all__ = ["FileCache"]
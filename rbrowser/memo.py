@@ -0,0 +1,83 @@
+"""
+Generation-keyed memoisation of serialised JSON responses.
+
+Several small endpoints are polled by every open UI but change rarely.
+`Generations` names the pieces of state they are built from (the node
+registry, the page cache, the settings, the favorites) and exposes one
+counter per piece, either bumped explicitly when the state is written or
+read from a component that already versions itself. `ResponseMemo` keeps the
+serialised body and ETag of each response together with the generations it
+was built at, and rebuilds it only after one of them has moved on.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable, Sequence, Tuple
+
+
+class Generations:
+    """Named change counters for state that responses are derived from."""
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, int] = {}
+        self._sources: Dict[str, Callable[[], int]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, source: Callable[[], int]) -> None:
+        """Read `name` from `source`, for components that keep their own version."""
+        self._sources[name] = source
+
+    def bump(self, name: str) -> None:
+        """Record that the state called `name` has changed."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+
+    def current(self, names: Sequence[str]) -> Tuple[int, ...]:
+        return tuple(
+            self._sources[name]() if name in self._sources else self._counters.get(name, 0) for name in names
+        )
+
+
+class ResponseMemo:
+    """Serialised JSON bodies, rebuilt only when the state behind them changes."""
+
+    def __init__(self, generations: Generations) -> None:
+        self.generations = generations
+        # name -> (key, etag, body)
+        self._entries: Dict[str, Tuple[Hashable, str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        name: str,
+        depends: Sequence[str],
+        build: Callable[[], Any],
+        extra: Hashable = (),
+    ) -> Tuple[str, bytes]:
+        """
+        Return the ETag and body of response `name`.
+
+        `depends` lists the generations the payload is built from; `extra`
+        covers cheap inputs that are not versioned (flags, time buckets).
+        The key is read before building, so a change made meanwhile is
+        picked up by the next call rather than lost.
+        """
+        key = (self.generations.current(depends), extra)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == key:
+                return entry[1], entry[2]
+
+        body = json.dumps(build(), separators=(",", ":")).encode("utf-8")
+        # Content-derived, so tags stay valid across restarts that reset
+        # the counters.
+        etag = f"{name}-{hashlib.sha1(body).hexdigest()[:16]}"
+        with self._lock:
+            self._entries[name] = (key, etag, body)
+        return etag, body
+
+
+__all__ = ["Generations", "ResponseMemo"]
@@ -9,16 +9,21 @@ avoid any direct dependency on Flask or higher-level application concerns.
 
 from __future__ import annotations
 
+import os
+import shutil
 import threading
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 import RNS
 
 
+@lru_cache(maxsize=4096)
 def _clean_hash(destination_hash: str) -> bytes:
-    """Convert NomadNet destination hash strings into raw bytes."""
+    """Convert NomadNet destination hash strings into raw bytes (memoised)."""
     stripped = destination_hash.replace("<", "").replace(">", "").replace(":", "")
     return bytes.fromhex(stripped)
 
@@ -52,6 +57,96 @@ def _recall_destination(destination_hash: bytes) -> Optional[RNS.Identity]:
     return identity
 
 
+class DestinationCache:
+    """
+    Bounded cache of outgoing node destinations keyed on destination hash.
+
+    Recalling an identity and building an `RNS.Destination` for every
+    request adds up on busy nodes, so both are kept here. Announces fill the
+    cache ahead of the first request and replace an entry whose identity
+    changed; misses fall back to `RNS.Identity.recall`.
+    """
+
+    def __init__(self, max_entries: int = 2048) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, RNS.Destination]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def resolve(self, destination_hash: bytes) -> Optional[RNS.Destination]:
+        """Destination for a node's pages, or None if its identity is unknown."""
+        with self._lock:
+            destination = self._entries.get(destination_hash)
+            if destination is not None:
+                self._entries.move_to_end(destination_hash)
+                self.hits += 1
+                return destination
+            self.misses += 1
+
+        identity = _recall_destination(destination_hash)
+        if not identity:
+            return None
+        return self._store(destination_hash, identity)
+
+    def learn(self, destination_hash: bytes, identity: RNS.Identity) -> None:
+        """Record the identity from an announce, replacing a different one."""
+        with self._lock:
+            current = self._entries.get(destination_hash)
+            if current is not None:
+                if current.identity.hash == identity.hash:
+                    return
+                self.invalidations += 1
+        self._store(destination_hash, identity)
+
+    def invalidate(self, destination_hash: bytes) -> None:
+        with self._lock:
+            self._entries.pop(destination_hash, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "clean_hash": _clean_hash.cache_info()._asdict(),
+            }
+
+    def _store(self, destination_hash: bytes, identity: RNS.Identity) -> RNS.Destination:
+        destination = RNS.Destination(identity, RNS.Destination.OUT, RNS.Destination.SINGLE, "nomadnetwork", "node")
+        with self._lock:
+            self._entries.pop(destination_hash, None)
+            self._entries[destination_hash] = destination
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return destination
+
+
+def _establish_link(
+    destinations: DestinationCache,
+    destination_hash: bytes,
+    timeout: float = 30,
+) -> Optional[RNS.Link]:
+    """Open a link to a node's page destination, waiting for the handshake."""
+    if not _wait_for_path(destination_hash, timeout=timeout):
+        return None
+    destination = destinations.resolve(destination_hash)
+    if destination is None:
+        return None
+
+    established = threading.Event()
+    link = RNS.Link(destination, established_callback=lambda _link: established.set())
+    if established.wait(timeout=timeout) and link.status == RNS.Link.ACTIVE:
+        return link
+    link.teardown()
+    return None
+
+
 @dataclass
 class RequestResult:
     """Simple container for asynchronous NomadNet responses."""
@@ -100,19 +195,13 @@ class NomadNetBrowser:
             if not _wait_for_path(self.destination_hash, timeout=timeout):
                 return {"error": "No path", "content": "No path to destination", "status": "error"}
 
-            identity = _recall_destination(self.destination_hash)
-            if not identity:
+            destination = self.main_browser.destinations.resolve(self.destination_hash)
+            if destination is None:
                 return {"error": "No identity", "content": "Could not recall identity", "status": "error"}
 
             print("✅ Path found, establishing connection...")
 
-            self.destination = RNS.Destination(
-                identity,
-                RNS.Destination.OUT,
-                RNS.Destination.SINGLE,
-                "nomadnetwork",
-                "node",
-            )
+            self.destination = destination
             self.link = RNS.Link(self.destination)
             self.result = RequestResult()
             self.response_event.clear()
@@ -192,7 +281,8 @@ class NomadNetBrowser:
                         self.result.data = decoded
                         print(f"✅ Received {len(decoded)} characters")
                     except UnicodeDecodeError:
-                        self.result.data = f"Binary data: {data.hex()[:200]}..."
+                        # Only the preview is hex-encoded, not the whole payload.
+                        self.result.data = f"Binary data: {memoryview(data)[:100].hex()}..."
                         print(f"⚠️ Received binary data: {len(data)} bytes")
                 else:
                     text = str(data)
@@ -239,18 +329,11 @@ class NomadNetBrowser:
             if not _wait_for_path(self.destination_hash, timeout=timeout):
                 return {"error": "No path", "message": "No path to destination", "status": "error"}
 
-            identity = _recall_destination(self.destination_hash)
-            if not identity:
+            destination = self.main_browser.destinations.resolve(self.destination_hash)
+            if destination is None:
                 return {"error": "No identity", "message": "Could not recall identity", "status": "error"}
 
             print("✅ Path found, measuring round-trip time...")
-            destination = RNS.Destination(
-                identity,
-                RNS.Destination.OUT,
-                RNS.Destination.SINGLE,
-                "nomadnetwork",
-                "node",
-            )
 
             self.link = RNS.Link(destination)
             self.result = RequestResult()
@@ -363,9 +446,25 @@ class NomadNetFileBrowser:
         self.result = RequestResult()
         self.response_event = threading.Event()
         self.file_path: str = ""
+        self.dest_path: Optional[str] = None
+
+    # Copy buffer used when spooling file responses to disk.
+    SPOOL_CHUNK = 1024 * 1024
+
+    def fetch_file(
+        self,
+        file_path: str,
+        timeout: float = 60,
+        progress_callback=None,
+        dest_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fetch a binary file from the remote node with optional progress tracking.
 
-    def fetch_file(self, file_path: str, timeout: float = 60, progress_callback=None) -> Dict[str, Any]:
-        """Fetch a binary file from the remote node with optional progress tracking."""
+        With `dest_path` the file is written there in chunks instead of being
+        returned in memory; the result then carries `path` and `size` and an
+        empty `content`.
+        """
         try:
             pretty_hash = RNS.prettyhexrep(self.destination_hash)[:16]
             print(f"🔍 Checking path to {pretty_hash} for file...")
@@ -373,23 +472,18 @@ class NomadNetFileBrowser:
             if not _wait_for_path(self.destination_hash, timeout=timeout):
                 return {"error": "No path", "content": b"", "status": "error"}
 
-            identity = _recall_destination(self.destination_hash)
-            if not identity:
+            destination = self.main_browser.destinations.resolve(self.destination_hash)
+            if destination is None:
                 return {"error": "No identity", "content": b"", "status": "error"}
 
             print("✅ Path found, establishing connection for file transfer...")
 
-            self.destination = RNS.Destination(
-                identity,
-                RNS.Destination.OUT,
-                RNS.Destination.SINGLE,
-                "nomadnetwork",
-                "node",
-            )
+            self.destination = destination
             self.link = RNS.Link(self.destination)
             self.result = RequestResult()
             self.response_event.clear()
             self.file_path = file_path
+            self.dest_path = dest_path
             self.progress_callback = progress_callback  # Store the callback
 
             print(f"📁 Requesting file: {file_path}")
@@ -397,6 +491,10 @@ class NomadNetFileBrowser:
             success = self.response_event.wait(timeout=timeout)
 
             if success and self.result.received:
+                if dest_path is not None:
+                    if not isinstance(self.result.data, int):
+                        return {"error": "Download failed", "content": b"", "status": "error"}
+                    return {"content": b"", "path": dest_path, "size": self.result.data, "status": "success", "error": None}
                 return {"content": self.result.data or b"", "status": "success", "error": None}
 
             return {"error": "Timeout", "content": b"", "status": "error"}
@@ -433,8 +531,13 @@ class NomadNetFileBrowser:
     def _on_response(self, receipt: RNS.RequestReceipt) -> None:
         try:
             data = receipt.response
-            
-            if isinstance(data, bytes):
+
+            if self.dest_path is not None:
+                # Spooled downloads keep the byte count as their result.
+                self.result.data = self._spool_to_file(data, self.dest_path)
+                filename = self.file_path.split('/')[-1] or "file"
+                print(f"✅ Download of {filename} completed ({self.result.data} bytes, spooled to disk)")
+            elif isinstance(data, (bytes, bytearray)):
                 self.result.data = data
                 filename = self.file_path.split('/')[-1] or "file"
                 print(f"✅ Download of {filename} completed ({len(data)} bytes)")
@@ -463,28 +566,26 @@ class NomadNetFileBrowser:
             self.result = RequestResult(data=b"", received=True)
             self.response_event.set()
 
-    def _handle_list_response(self, data: list[Any]) -> bytes:
+    def _handle_list_response(self, data: list[Any]) -> bytearray:
         """Handle list responses, preserving binary data whenever possible."""
         try:
-            if all(isinstance(item, bytes) for item in data):
-                combined = b"".join(data)
-                # Removed: print statement
-                return combined
-
-            binary_parts = []
-            for item in data:
-                if isinstance(item, bytes):
-                    binary_parts.append(item)
-                elif isinstance(item, str):
-                    binary_parts.append(item.encode("latin1"))
-
-            combined = b"".join(binary_parts)
-            # Removed: print statement
+            parts = [
+                item.encode("latin1") if isinstance(item, str) else memoryview(item).cast("B")
+                for item in data
+                if isinstance(item, (str, bytes, bytearray, memoryview))
+            ]
+            # One pass into a buffer sized up front: each part is copied once.
+            combined = bytearray(sum(len(part) for part in parts))
+            view = memoryview(combined)
+            offset = 0
+            for part in parts:
+                view[offset:offset + len(part)] = part
+                offset += len(part)
             return combined
 
         except Exception as exc:
             print(f"❌ Error processing list data: {exc}")
-            return b""
+            return bytearray()
 
     @staticmethod
     def _read_file_object(file_obj: Any) -> bytes:
@@ -492,22 +593,68 @@ class NomadNetFileBrowser:
         try:
             if hasattr(file_obj, "seek"):
                 file_obj.seek(0)
-            content = file_obj.read()
+            if hasattr(file_obj, "readinto") and hasattr(file_obj, "fileno"):
+                # Read straight into a buffer of the final size.
+                content = bytearray(os.fstat(file_obj.fileno()).st_size)
+                view = memoryview(content)
+                filled = 0
+                while filled < len(content):
+                    count = file_obj.readinto(view[filled:])
+                    if not count:
+                        break
+                    filled += count
+                del view
+                del content[filled:]
+            else:
+                content = file_obj.read()
             if hasattr(file_obj, "close"):
                 file_obj.close()
 
-            if isinstance(content, bytes):
-                # Removed: print statement
+            if isinstance(content, (bytes, bytearray)):
                 return content
 
-            encoded = content.encode("latin1")
-            # Removed: print statement
-            return encoded
+            return content.encode("latin1")
 
         except Exception as exc:
             print(f"❌ Error reading file object: {exc}")
             return b""
 
+    def _spool_to_file(self, data: Any, dest_path: str) -> int:
+        """Write a response to `dest_path` without holding it all in memory."""
+        source_path = getattr(data, "name", None)
+        if isinstance(source_path, str) and os.path.isfile(source_path):
+            # File responses arrive as an open handle on Reticulum's own
+            # temporary file, which it deletes once this callback returns.
+            # Taking the file over moves no data at all; across filesystems
+            # the kernel copies it without passing through Python.
+            data.close()
+            try:
+                os.replace(source_path, dest_path)
+            except OSError:
+                shutil.copyfile(source_path, dest_path)
+            return os.path.getsize(dest_path)
+
+        with open(dest_path, "wb") as handle:
+            if hasattr(data, "read"):
+                if hasattr(data, "seek"):
+                    data.seek(0)
+                shutil.copyfileobj(data, handle, self.SPOOL_CHUNK)
+                if hasattr(data, "close"):
+                    data.close()
+            elif isinstance(data, list):
+                for item in data:
+                    if isinstance(item, (bytes, bytearray, memoryview)):
+                        handle.write(item)
+                    elif isinstance(item, str):
+                        handle.write(item.encode("latin1"))
+            elif isinstance(data, str):
+                handle.write(data.encode("utf-8"))
+            elif isinstance(data, (bytes, bytearray, memoryview)):
+                handle.write(data)
+            else:
+                print(f"❌ Unknown data type: {type(data)}")
+            return handle.tell()
+
     def _on_request_failed(self, _receipt: RNS.RequestReceipt) -> None:
         print("❌ File request failed")
         self.result = RequestResult(data=b"", received=True)
@@ -0,0 +1,107 @@
+"""
+Background maintenance of per-node path information.
+
+Hop counts and next-hop interfaces used to be looked up in the Reticulum
+transport tables for every node on every `/api/nodes` poll. `PathMonitor`
+stores them on the node records instead and only recomputes a node when its
+path table entry changes.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import RNS
+
+from .nomadnet import _clean_hash
+
+
+PathStamp = Optional[Tuple[Any, Any]]
+
+
+class PathMonitor:
+    """Refresh hop and interface data on registry records when paths change."""
+
+    def __init__(self, browser: "NomadNetWebBrowser", interval: float = 5.0) -> None:
+        self.browser = browser
+        self.interval = interval
+
+        self._stamps: Dict[str, PathStamp] = {}
+        self._raw_hashes: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def path_info(self, node_hash: str) -> Dict[str, Any]:
+        """Compute path info for a node and remember the entry it came from."""
+        destination_hash = self._raw_hash(node_hash)
+        with self._lock:
+            self._stamps[node_hash] = self._path_stamp(destination_hash)
+        return self.browser.get_node_hops(destination_hash)
+
+    def refresh(self) -> int:
+        """Update every node whose path entry changed; returns the count."""
+        updated = 0
+        nodes = self.browser.registry.snapshot().nodes
+        with self._lock:
+            for node_hash in [node_hash for node_hash in self._stamps if node_hash not in nodes]:
+                self._stamps.pop(node_hash, None)
+                self._raw_hashes.pop(node_hash, None)
+
+        for node_hash in list(nodes):
+            destination_hash = self._raw_hash(node_hash)
+            stamp = self._path_stamp(destination_hash)
+            with self._lock:
+                if node_hash in self._stamps and self._stamps[node_hash] == stamp:
+                    continue
+
+            info = self.path_info(node_hash)
+
+            def update(record):
+                record.hops = info["hops"]
+                record.next_hop_interface = info["next_hop_interface"]
+                return record
+
+            if self.browser.registry.get(node_hash) is not None:
+                self.browser.registry.modify(node_hash, update)
+                updated += 1
+        return updated
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception as exc:
+                print(f"Path monitor error: {exc}")
+
+    def _raw_hash(self, node_hash: str) -> bytes:
+        raw = self._raw_hashes.get(node_hash)
+        if raw is None:
+            raw = _clean_hash(node_hash)
+            self._raw_hashes[node_hash] = raw
+        return raw
+
+    @staticmethod
+    def _path_stamp(destination_hash: bytes) -> PathStamp:
+        # The entry timestamp and hop count change whenever Reticulum learns
+        # a new path, which is all that is needed to spot stale data.
+        path_table = getattr(RNS.Transport, "path_table", None)
+        if not path_table:
+            return None
+        entry = path_table.get(destination_hash)
+        if not entry:
+            return None
+        return (entry[0], entry[2])
+
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .web_browser import NomadNetWebBrowser
@@ -0,0 +1,294 @@
+"""
+Speculative prefetch of pages linked from the page being read.
+
+After a page is opened through the API, the links it contains are ranked by
+how often users followed them before (from that page, then overall) and the
+top few same-node pages are requested over the link that is already open.
+Results go to a small in-memory hot page cache that `/api/fetch` consults
+first. Each node may only hold a limited number of unused prefetched pages,
+and prefetches go through the background priority lane and bandwidth budget
+like any other cache fetch.
+"""
+
+from __future__ import annotations
+
+import queue
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+
+from .cache_stats import page_is_valid
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .web_browser import NomadNetWebBrowser
+
+
+# `[label`url`fields] -- label and fields are optional.
+_LINK_RE = re.compile(r"`\[([^\]]*)\]")
+
+# Pages that ask not to be cached (NomadNet cache directive).
+_NO_CACHE_RE = re.compile(r"^#!c=0\s*$", re.MULTILINE)
+
+PageKey = Tuple[str, str]
+
+
+def parse_page_links(content: str, node_hash: str) -> List[str]:
+    """Paths of pages on `node_hash` linked from `content`, in page order."""
+    paths: List[str] = []
+    seen: Set[str] = set()
+    for match in _LINK_RE.finditer(content):
+        components = match.group(1).split("`")
+        if len(components) > 3:
+            continue
+        url = components[0] if len(components) == 1 else components[1]
+        # Links that submit fields depend on form input; never prefetch them.
+        if len(components) == 3 and components[2]:
+            continue
+        if ":" in url:
+            destination, url = url.split(":", 1)
+            if destination and destination.lower() != node_hash.lower():
+                continue
+        if not url.startswith("/page/") or url in seen:
+            continue
+        seen.add(url)
+        paths.append(url)
+    return paths
+
+
+class HotPageCache:
+    """Short-lived LRU of prefetched pages, with per-node limits on unused ones."""
+
+    def __init__(self, max_entries: int = 200, ttl: float = 300.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # (node, path) -> (content, stored_at)
+        self._entries: "OrderedDict[PageKey, Tuple[str, float]]" = OrderedDict()
+        self._per_node: Counter = Counter()
+        self._lock = threading.Lock()
+        self.wasted = 0
+
+    def get(self, node_hash: str, page_path: str) -> Optional[str]:
+        """Take a page out of the cache; each prefetch serves one request."""
+        key = (node_hash, page_path)
+        with self._lock:
+            entry = self._pop_locked(key)
+            if entry is None:
+                return None
+            if time.time() - entry[1] > self.ttl:
+                self.wasted += 1
+                return None
+            return entry[0]
+
+    def contains(self, node_hash: str, page_path: str) -> bool:
+        with self._lock:
+            return (node_hash, page_path) in self._entries
+
+    def held_for(self, node_hash: str) -> int:
+        with self._lock:
+            self._expire_locked()
+            return self._per_node[node_hash]
+
+    def put(self, node_hash: str, page_path: str, content: str) -> None:
+        key = (node_hash, page_path)
+        with self._lock:
+            self._pop_locked(key)
+            self._entries[key] = (content, time.time())
+            self._per_node[node_hash] += 1
+            while len(self._entries) > self.max_entries:
+                self._pop_locked(next(iter(self._entries)))
+                self.wasted += 1
+
+    def discard_node(self, node_hash: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == node_hash]:
+                self._pop_locked(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._per_node.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire_locked(self) -> None:
+        cutoff = time.time() - self.ttl
+        while self._entries:
+            key, (_, stored_at) = next(iter(self._entries.items()))
+            if stored_at >= cutoff:
+                break
+            self._pop_locked(key)
+            self.wasted += 1
+
+    def _pop_locked(self, key: PageKey) -> Optional[Tuple[str, float]]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._per_node[key[0]] -= 1
+            if not self._per_node[key[0]]:
+                del self._per_node[key[0]]
+        return entry
+
+
+class Prefetcher:
+    """Ranks links on opened pages and prefetches the likeliest next ones."""
+
+    # Remembered click-through counts, per (node, from page) and per page.
+    MAX_TRACKED = 5000
+
+    def __init__(self, browser: "NomadNetWebBrowser") -> None:
+        self.browser = browser
+        self.pages = HotPageCache()
+
+        self._queue: "queue.Queue[PageKey]" = queue.Queue()
+        self._pending: Set[PageKey] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self._transitions: "OrderedDict[PageKey, Counter]" = OrderedDict()
+        self._visits: "OrderedDict[PageKey, int]" = OrderedDict()
+        self._last_page: Dict[str, str] = {}
+
+        self.prefetched = 0
+        self.hits = 0
+        self.misses = 0
+        self.failed = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.browser.cache_settings.get("prefetch_enabled", False))
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, daemon=True)
+            self._thread.start()
+
+    # ------------------------------------------------------------------ #
+    # Hooks for /api/fetch                                               #
+    # ------------------------------------------------------------------ #
+
+    def lookup(self, node_hash: str, page_path: str) -> Optional[str]:
+        """Return a prefetched copy of a page, counting the hit or miss."""
+        if not self.enabled:
+            return None
+        content = self.pages.get(node_hash, page_path)
+        with self._lock:
+            if content is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return content
+
+    def page_opened(self, node_hash: str, page_path: str, content: str) -> None:
+        """Record a user navigation and queue prefetches for its links."""
+        self._record_click(node_hash, page_path)
+        if not self.enabled or self.browser.is_offline():
+            return
+
+        held = self.pages.held_for(node_hash)
+        with self._lock:
+            held += sum(1 for pending_node, _ in self._pending if pending_node == node_hash)
+        budget = int(self.browser.cache_settings.get("prefetch_node_budget", 6)) - held
+        count = min(int(self.browser.cache_settings.get("prefetch_links", 3)), budget)
+
+        for path in self.rank_links(node_hash, page_path, content):
+            if count <= 0:
+                break
+            key = (node_hash, path)
+            with self._lock:
+                if key in self._pending or self.pages.contains(*key):
+                    continue
+                self._pending.add(key)
+            self._queue.put(key)
+            count -= 1
+
+    def page_changed(self, node_hash: str) -> None:
+        """Drop prefetched pages after a form submission may have changed them."""
+        self.pages.discard_node(node_hash)
+
+    def rank_links(self, node_hash: str, page_path: str, content: str) -> List[str]:
+        """Same-node links on a page, likeliest next click first."""
+        links = [path for path in parse_page_links(content, node_hash) if path != page_path]
+        with self._lock:
+            followed = self._transitions.get((node_hash, page_path), Counter())
+            visits = {path: self._visits.get((node_hash, path), 0) for path in links}
+        order = {path: index for index, path in enumerate(links)}
+        return sorted(links, key=lambda path: (-followed[path], -visits[path], order[path]))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "prefetched": self.prefetched,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "used_rate": round(self.hits / self.prefetched, 3) if self.prefetched else 0.0,
+                "wasted": self.pages.wasted,
+                "failed": self.failed,
+                "skipped_no_link": self.skipped,
+                "held": len(self.pages),
+                "queued": len(self._pending),
+            }
+
+    # ------------------------------------------------------------------ #
+    # Internals                                                          #
+    # ------------------------------------------------------------------ #
+
+    def _record_click(self, node_hash: str, page_path: str) -> None:
+        with self._lock:
+            previous = self._last_page.get(node_hash)
+            self._last_page[node_hash] = page_path
+            if previous is not None and previous != page_path:
+                self._bump(self._transitions, (node_hash, previous), Counter())[page_path] += 1
+            key = (node_hash, page_path)
+            self._visits[key] = self._bump(self._visits, key, 0) + 1
+
+    def _bump(self, table: OrderedDict, key: PageKey, default: Any) -> Any:
+        value = table.pop(key, default)
+        table[key] = value
+        while len(table) > self.MAX_TRACKED:
+            table.popitem(last=False)
+        return value
+
+    def _worker(self) -> None:
+        while True:
+            node_hash, page_path = key = self._queue.get()
+            try:
+                if self.enabled:
+                    self._prefetch(node_hash, page_path)
+            except Exception as exc:
+                print(f"❌ Prefetch of {page_path} from {node_hash[:16]}... failed: {exc}")
+                with self._lock:
+                    self.failed += 1
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+    def _prefetch(self, node_hash: str, page_path: str) -> None:
+        interface = self.browser.node_interface(node_hash)
+        self.browser.cache.bandwidth.acquire(interface)
+        with self.browser.priority.background(node_hash, interface):
+            # Only ride on a link the user already opened; never set up a
+            # new one just for a guess.
+            response = self.browser.request_over_open_link(node_hash, page_path)
+        if response is None:
+            with self._lock:
+                self.skipped += 1
+            return
+
+        content = response.get("content") or ""
+        self.browser.cache.bandwidth.charge(interface, len(content.encode("utf-8", errors="replace")))
+        if response["status"] != "success" or not page_is_valid(content):
+            with self._lock:
+                self.failed += 1
+            return
+        if _NO_CACHE_RE.search(content):
+            return
+        self.pages.put(node_hash, page_path, content)
+        with self._lock:
+            self.prefetched += 1
+        print(f"🔮 Prefetched {page_path} from {node_hash[:16]}...")
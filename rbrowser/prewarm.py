@@ -0,0 +1,154 @@
+"""
+Path and link pre-warming for favorite and recently visited nodes.
+
+The first request to a node usually spends most of its time waiting for a
+path and for the link handshake. `PathWarmer` asks Reticulum for paths to
+the favorites and the most recently visited nodes shortly after startup and
+then periodically, and can optionally open links to them ahead of time.
+Links are only opened while the link pool has room, so pre-warming never
+displaces a link the user is actually using.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import RNS
+
+from .nomadnet import _clean_hash, _establish_link
+
+
+# First pass runs once Reticulum has had time to come up.
+STARTUP_DELAY = 20.0
+WARM_INTERVAL = 600.0
+
+# Seconds allowed for the path and then the handshake of a warmed link.
+LINK_TIMEOUT = 20.0
+
+# Recently visited nodes remembered for pre-warming.
+MAX_RECENT = 50
+
+
+class PathWarmer:
+    """Periodically requests paths (and optionally links) to likely nodes."""
+
+    def __init__(self, browser: "NomadNetWebBrowser") -> None:
+        self.browser = browser
+        self._recent: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.passes = 0
+        self.paths_requested = 0
+        self.paths_known = 0
+        self.links_opened = 0
+        self.links_failed = 0
+        self.last_pass: Optional[float] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def wake(self) -> None:
+        """Run a pass now, e.g. after the favorites changed."""
+        self._wake.set()
+
+    def note_visit(self, node_hash: str) -> None:
+        """Remember a node the user opened."""
+        with self._lock:
+            self._recent.pop(node_hash, None)
+            self._recent[node_hash] = time.time()
+            while len(self._recent) > MAX_RECENT:
+                self._recent.popitem(last=False)
+
+    def recent_nodes(self) -> List[str]:
+        """Nodes the user opened, most recent first."""
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def targets(self) -> List[str]:
+        """Favorites first, then the most recently visited nodes."""
+        targets = [favorite["hash"] for favorite in self.browser.favorites if favorite.get("hash")]
+
+        recent_count = int(self.browser.cache_settings.get("prewarm_recent", 10))
+        recent = self.recent_nodes()[: max(recent_count, 0)]
+        return list(dict.fromkeys(targets + recent))
+
+    def warm(self) -> None:
+        """Run one pre-warming pass."""
+        open_links = bool(self.browser.cache_settings.get("prewarm_links", False))
+        requested = known = 0
+        for node_hash in self.targets():
+            try:
+                destination_hash = _clean_hash(node_hash)
+            except ValueError:
+                continue
+            if RNS.Transport.has_path(destination_hash):
+                known += 1
+            else:
+                RNS.Transport.request_path(destination_hash)
+                requested += 1
+            if open_links:
+                self._warm_link(node_hash, destination_hash)
+
+        with self._lock:
+            self.passes += 1
+            self.paths_requested += requested
+            self.paths_known = known
+            self.last_pass = time.time()
+        if requested:
+            print(f"🔥 Pre-warm: requested {requested} paths ({known} already known)")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": bool(self.browser.cache_settings.get("prewarm_enabled", True)),
+                "keep_links": bool(self.browser.cache_settings.get("prewarm_links", False)),
+                "passes": self.passes,
+                "paths_requested": self.paths_requested,
+                "paths_known": self.paths_known,
+                "links_opened": self.links_opened,
+                "links_failed": self.links_failed,
+                "open_links": self.browser.open_link_count(),
+                "link_pool_size": self.browser.cache_settings.get("link_pool_size", 16),
+                "last_pass": self.last_pass,
+            }
+
+    def _warm_link(self, node_hash: str, destination_hash: bytes) -> None:
+        if self.browser.has_open_link(destination_hash) or not self.browser.link_pool_has_room():
+            return
+
+        interface = self.browser.node_interface(node_hash)
+        self.browser.cache.bandwidth.acquire(interface)
+        with self.browser.priority.background(node_hash, interface):
+            link = _establish_link(self.browser.destinations, destination_hash, timeout=LINK_TIMEOUT)
+        with self._lock:
+            if link is None:
+                self.links_failed += 1
+            else:
+                self.links_opened += 1
+        if link is not None:
+            self.browser.remember_link(destination_hash, link)
+            print(f"🔥 Pre-warm: link open to {node_hash[:16]}...")
+
+    def _run(self) -> None:
+        self._wake.wait(STARTUP_DELAY)
+        while True:
+            if self.browser.cache_settings.get("prewarm_enabled", True) and not self.browser.is_offline():
+                try:
+                    self.warm()
+                except Exception as exc:
+                    print(f"❌ Pre-warm pass failed: {exc}")
+            self._wake.clear()
+            self._wake.wait(WARM_INTERVAL)
+
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .web_browser import NomadNetWebBrowser
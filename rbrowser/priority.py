@@ -0,0 +1,139 @@
+"""
+Two-class scheduling for mesh requests.
+
+Pages the user asked for and background cache fetches share the same links
+and interfaces. `PriorityGate` tracks interactive requests in flight and
+makes background work wait while one is running to the same node or over
+the same interface, plus a short grace period so a user following links
+does not lose the link to a cache fetch between clicks. Latency is recorded
+per class so user-perceived response times can be watched on their own.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator
+
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+# Background work stays paused this long after an interactive request ends.
+INTERACTIVE_GRACE = 2.0
+
+# Longest a background request waits before going ahead anyway.
+MAX_BACKGROUND_WAIT = 120.0
+
+# Recent durations kept per class for percentiles.
+LATENCY_SAMPLES = 500
+
+
+class _ClassStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.in_flight = 0
+        self.durations: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def report(self) -> Dict[str, Any]:
+        ordered = sorted(self.durations)
+
+        def percentile(fraction: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000, 1)
+
+        return {
+            "count": self.count,
+            "in_flight": self.in_flight,
+            "latency_ms": {
+                "mean": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else 0.0,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+            },
+            "yielded": self.waits,
+            "yield_seconds": round(self.wait_seconds, 3),
+        }
+
+
+class PriorityGate:
+    """Lets interactive requests run first and holds background ones back."""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._nodes: Dict[str, int] = {}
+        self._interfaces: Dict[str, int] = {}
+        self._quiet_after: Dict[str, float] = {}
+        self._stats = {INTERACTIVE: _ClassStats(), BACKGROUND: _ClassStats()}
+
+    @contextmanager
+    def interactive(self, node_hash: str, interface: str) -> Iterator[None]:
+        """Mark a user request in flight for its duration."""
+        with self._condition:
+            self._nodes[node_hash] = self._nodes.get(node_hash, 0) + 1
+            self._interfaces[interface] = self._interfaces.get(interface, 0) + 1
+            self._stats[INTERACTIVE].in_flight += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            finished = time.monotonic()
+            with self._condition:
+                for counts, key in ((self._nodes, node_hash), (self._interfaces, interface)):
+                    counts[key] -= 1
+                    if not counts[key]:
+                        del counts[key]
+                self._quiet_after[interface] = finished + INTERACTIVE_GRACE
+                self._finish_locked(INTERACTIVE, finished - started)
+                self._condition.notify_all()
+
+    @contextmanager
+    def background(self, node_hash: str, interface: str) -> Iterator[None]:
+        """Wait until no interactive request needs the node or interface, then run."""
+        waited = 0.0
+        with self._condition:
+            deadline = time.monotonic() + MAX_BACKGROUND_WAIT
+            while True:
+                now = time.monotonic()
+                delay = self._blocked_for_locked(node_hash, interface, now)
+                if delay <= 0 or now >= deadline:
+                    break
+                self._condition.wait(min(delay, deadline - now))
+                waited += time.monotonic() - now
+
+            stats = self._stats[BACKGROUND]
+            stats.in_flight += 1
+            if waited:
+                stats.waits += 1
+                stats.wait_seconds += waited
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._finish_locked(BACKGROUND, time.monotonic() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {name: stats.report() for name, stats in self._stats.items()}
+
+    def _blocked_for_locked(self, node_hash: str, interface: str, now: float) -> float:
+        """Seconds to wait before re-checking; 0 when background work may run."""
+        if node_hash in self._nodes or interface in self._interfaces:
+            # Woken by the request finishing; the timeout is a safety net.
+            return INTERACTIVE_GRACE
+        return max(self._quiet_after.get(interface, 0.0) - now, 0.0)
+
+    def _finish_locked(self, name: str, duration: float) -> None:
+        stats = self._stats[name]
+        stats.in_flight -= 1
+        stats.count += 1
+        stats.durations.append(duration)
+
+
+__all__ = ["BACKGROUND", "INTERACTIVE", "PriorityGate"]
@@ -0,0 +1,229 @@
+"""
+Background reachability monitoring for known nodes.
+
+`ReachabilityMonitor` cycles through the nodes the user cares about (the
+favorites, then the most recently opened nodes, up to a configurable count)
+with a small pool of probe threads. A probe sets up a link of its own, takes
+the round-trip time from the handshake and tears the link down again, so no
+page is downloaded and the shared link pool is left alone. Each node keeps
+an up/down state and a short RTT history, and the whole table can be read in
+one call instead of pinging nodes one by one.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .nomadnet import _clean_hash, _establish_link
+
+
+# Consecutive failed probes before a node counts as down.
+FAILURES_FOR_DOWN = 2
+
+# Probe results kept per node.
+HISTORY_LENGTH = 20
+
+PROBE_TIMEOUT = 15.0
+
+# Seconds a result for a node outside the watched set (a manual ping) stays
+# in the table after its last probe.
+UNWATCHED_TTL = 24 * 3600.0
+
+# Seconds between scheduling passes while nothing is due, and while
+# probes are still being handed out.
+SCHEDULE_INTERVAL = 30.0
+BUSY_INTERVAL = 1.0
+
+
+class NodeReachability:
+    """Probe results for one node."""
+
+    __slots__ = ("status", "rtt", "history", "last_probe", "last_up", "failures", "probes")
+
+    def __init__(self) -> None:
+        self.status = "unknown"
+        self.rtt: Optional[float] = None
+        # (timestamp, rtt in seconds or None for a failed probe)
+        self.history: Deque[Tuple[float, Optional[float]]] = deque(maxlen=HISTORY_LENGTH)
+        self.last_probe = 0.0
+        self.last_up: Optional[float] = None
+        self.failures = 0
+        self.probes = 0
+
+    def record(self, rtt: Optional[float], now: float) -> None:
+        self.probes += 1
+        self.last_probe = now
+        self.history.append((now, rtt))
+        if rtt is None:
+            self.failures += 1
+            if self.failures >= FAILURES_FOR_DOWN:
+                self.status = "down"
+        else:
+            self.failures = 0
+            self.status = "up"
+            self.rtt = rtt
+            self.last_up = now
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples = [rtt for _, rtt in self.history if rtt is not None]
+        return {
+            "status": self.status,
+            "rtt_ms": round(self.rtt * 1000, 1) if self.rtt is not None else None,
+            "avg_rtt_ms": round(sum(samples) / len(samples) * 1000, 1) if samples else None,
+            "success_rate": round(len(samples) / len(self.history), 3) if self.history else None,
+            "last_probe": self.last_probe or None,
+            "last_up": self.last_up,
+            "probes": self.probes,
+            "history": [[round(ts, 1), round(rtt * 1000, 1) if rtt is not None else None] for ts, rtt in self.history],
+        }
+
+
+class ReachabilityMonitor:
+    """Probes known nodes in the background with bounded concurrency."""
+
+    def __init__(self, browser: "NomadNetWebBrowser") -> None:
+        self.browser = browser
+        self._nodes: Dict[str, NodeReachability] = {}
+        self._in_flight: set = set()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            # Daemon threads, so a probe in progress never holds up shutdown.
+            workers = max(1, int(self.browser.cache_settings.get("reachability_concurrency", 2)))
+            for _ in range(workers):
+                threading.Thread(target=self._probe_worker, daemon=True).start()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+
+    def record(self, node_hash: str, rtt: Optional[float]) -> None:
+        """Fold a probe or manual ping result into the table."""
+        with self._lock:
+            state = self._nodes.get(node_hash)
+            if state is None:
+                state = self._nodes[node_hash] = NodeReachability()
+            state.record(rtt, time.time())
+            status = state.status
+        self.browser.events.publish("reachability", {"node_hash": node_hash, "status": status})
+
+    def probe(self, node_hash: str) -> Optional[float]:
+        """Measure a node's link RTT in seconds; None when it could not be reached."""
+        # Always a fresh handshake: a pooled link's RTT dates from when it
+        # was opened, however long ago that was.
+        destination_hash = _clean_hash(node_hash)
+        interface = self.browser.node_interface(node_hash)
+        self.browser.cache.bandwidth.acquire(interface)
+        with self.browser.priority.background(node_hash, interface):
+            started = time.monotonic()
+            link = _establish_link(self.browser.destinations, destination_hash, timeout=PROBE_TIMEOUT)
+            elapsed = time.monotonic() - started
+        if link is None:
+            rtt = None
+        else:
+            rtt = link.rtt if link.rtt is not None else elapsed
+            link.teardown()
+        self.record(node_hash, rtt)
+        return rtt
+
+    def status(self, node_hash: str) -> str:
+        with self._lock:
+            state = self._nodes.get(node_hash)
+            return state.status if state is not None else "unknown"
+
+    def table(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {node_hash: state.to_dict() for node_hash, state in self._nodes.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for state in self._nodes.values():
+                counts[state.status] = counts.get(state.status, 0) + 1
+            return {
+                "enabled": bool(self.browser.cache_settings.get("reachability_enabled", True)),
+                "max_nodes": self.browser.cache_settings.get("reachability_max_nodes", 50),
+                "tracked": len(self._nodes),
+                "in_flight": len(self._in_flight),
+                "interval_minutes": self.browser.cache_settings.get("reachability_interval_minutes", 30),
+                "status": counts,
+            }
+
+    # ------------------------------------------------------------------ #
+    # Scheduling                                                         #
+    # ------------------------------------------------------------------ #
+
+    def _run(self) -> None:
+        delay = SCHEDULE_INTERVAL
+        while True:
+            time.sleep(delay)
+            delay = SCHEDULE_INTERVAL
+            if not self.browser.cache_settings.get("reachability_enabled", True) or self.browser.is_offline():
+                continue
+            try:
+                due = self._due_nodes()
+                for node_hash in due:
+                    self._queue.put(node_hash)
+                if due or self._in_flight:
+                    delay = BUSY_INTERVAL
+            except Exception as exc:
+                print(f"❌ Reachability scheduling failed: {exc}")
+
+    def watched(self) -> List[str]:
+        """Nodes to probe: favorites, then recently opened nodes, up to `reachability_max_nodes`."""
+        max_nodes = int(self.browser.cache_settings.get("reachability_max_nodes", 50))
+        favorites = [favorite["hash"] for favorite in self.browser.favorites if favorite.get("hash")]
+        watched = list(dict.fromkeys(favorites + self.browser.prewarmer.recent_nodes()))
+        return watched[: max(max_nodes, 0)]
+
+    def _due_nodes(self) -> List[str]:
+        """Watched nodes whose last probe is older than the interval, least recent first."""
+        interval = float(self.browser.cache_settings.get("reachability_interval_minutes", 30)) * 60
+        workers = max(1, int(self.browser.cache_settings.get("reachability_concurrency", 2)))
+        watched = set(self.watched())
+        now = time.time()
+        with self._lock:
+            # Unwatched nodes are never probed here; their results (manual
+            # pings, or nodes that dropped out of the watched set) age out.
+            expired = [
+                node_hash
+                for node_hash, state in self._nodes.items()
+                if node_hash not in watched and now - state.last_probe > UNWATCHED_TTL
+            ]
+            for node_hash in expired:
+                del self._nodes[node_hash]
+            capacity = workers - len(self._in_flight)
+            candidates = [
+                (self._nodes[node_hash].last_probe if node_hash in self._nodes else 0.0, node_hash)
+                for node_hash in watched
+                if node_hash not in self._in_flight
+            ]
+            due = sorted(item for item in candidates if now - item[0] >= interval)[: max(capacity, 0)]
+            self._in_flight.update(node_hash for _, node_hash in due)
+        return [node_hash for _, node_hash in due]
+
+    def _probe_worker(self) -> None:
+        while True:
+            node_hash = self._queue.get()
+            try:
+                self.probe(node_hash)
+            except Exception as exc:
+                print(f"❌ Reachability probe of {node_hash[:16]}... failed: {exc}")
+            finally:
+                with self._lock:
+                    self._in_flight.discard(node_hash)
+
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .web_browser import NomadNetWebBrowser
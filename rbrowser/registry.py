@@ -0,0 +1,419 @@
+"""
+Node registry for announced NomadNet nodes.
+
+Announces arrive on the Reticulum thread while the Flask routes read the node
+list from WSGI threads. The registry publishes immutable, versioned snapshots
+so readers never lock and never see a dictionary change under them; writers
+stage updates and publish them in small batches.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Tuple
+
+
+# (version, added, changed, removed) for one published batch.
+ChangeEntry = Tuple[int, frozenset, frozenset, frozenset]
+
+# Sorted secondary index entries: (sort key, node hash).
+IndexEntry = Tuple[Any, str]
+
+# Hop counts that are not numbers sort after every real path.
+UNKNOWN_HOPS = 1 << 16
+
+# Sorts beyond the last possible node hash, for inclusive upper bounds.
+_HASH_MAX = "\U0010ffff"
+
+
+class NodeRecord:
+    """
+    One announced node.
+
+    Records are slotted and keep `last_seen_ts` as an epoch float; the ISO
+    `last_seen` string the API exposes is only produced by `to_dict`.
+    Published records are shared between readers and must not be mutated.
+    """
+
+    __slots__ = (
+        "hash",
+        "name",
+        "announce_count",
+        "node_announce_count",
+        "last_seen_ts",
+        "app_data_length",
+        "hops",
+        "next_hop_interface",
+    )
+
+    def __init__(
+        self,
+        hash: str,
+        name: str = "",
+        announce_count: int = 0,
+        node_announce_count: int = 0,
+        last_seen_ts: float = 0.0,
+        app_data_length: int = 0,
+        hops: Any = "Unknown",
+        next_hop_interface: str = "Unknown",
+    ) -> None:
+        self.hash = hash
+        self.name = name
+        self.announce_count = announce_count
+        self.node_announce_count = node_announce_count
+        self.last_seen_ts = last_seen_ts
+        self.app_data_length = app_data_length
+        self.hops = hops
+        self.next_hop_interface = next_hop_interface
+
+    def copy(self) -> "NodeRecord":
+        return NodeRecord(*self.to_list())
+
+    def to_list(self) -> List[Any]:
+        """Positional form used for the on-disk registry."""
+        return [getattr(self, slot) for slot in self.__slots__]
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> "NodeRecord":
+        return cls(*values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON form served by the node list API."""
+        data = {slot: getattr(self, slot) for slot in self.__slots__}
+        data["last_seen"] = datetime.fromtimestamp(self.last_seen_ts).isoformat()
+        return data
+
+    def memory_size(self) -> int:
+        """Bytes held by this record and the field values it owns."""
+        size = sys.getsizeof(self)
+        for slot in ("hash", "name", "hops", "next_hop_interface", "last_seen_ts"):
+            size += sys.getsizeof(getattr(self, slot))
+        return size
+
+    def __repr__(self) -> str:
+        return f"NodeRecord({self.hash!r}, {self.name!r})"
+
+
+def _hops_key(record: NodeRecord) -> int:
+    hops = record.hops
+    return hops if isinstance(hops, int) else UNKNOWN_HOPS
+
+
+SORT_KEYS: Dict[str, Callable[[NodeRecord], Any]] = {
+    # Order of first announce (`announce_count` is the announce number then).
+    "first_seen": lambda record: record.announce_count,
+    "name": lambda record: (record.name or "").lower(),
+    "last_seen": lambda record: record.last_seen_ts,
+    "hops": _hops_key,
+    "announces": lambda record: record.node_announce_count,
+}
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """A consistent, read-only view of the registry at one version."""
+
+    version: int
+    nodes: Mapping[str, NodeRecord]
+    # One ascending list of (key, hash) per entry in SORT_KEYS.
+    indexes: Mapping[str, List[IndexEntry]] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class RegistryDelta:
+    """Node hashes that differ between an older version and `version`."""
+
+    version: int
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+
+
+class NodeRegistry:
+    """Copy-on-write store of node records keyed on the clean hex hash."""
+
+    def __init__(self, batch_interval: float = 0.25, history: int = 256) -> None:
+        self.batch_interval = batch_interval
+        self.evicted = 0
+        self._changes: Deque[ChangeEntry] = deque(maxlen=history)
+
+        self._snapshot = RegistrySnapshot(0, MappingProxyType({}), _build_indexes({}))
+        self._pending: Dict[str, Optional[NodeRecord]] = {}
+        self._write_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._listeners: List[Callable[[RegistrySnapshot], None]] = []
+
+    # ------------------------------------------------------------------ #
+    # Readers                                                            #
+    # ------------------------------------------------------------------ #
+
+    def snapshot(self) -> RegistrySnapshot:
+        """Return the latest published snapshot (a single attribute read)."""
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def get(self, node_hash: str) -> Optional[NodeRecord]:
+        return self._snapshot.nodes.get(node_hash)
+
+    def __len__(self) -> int:
+        return len(self._snapshot.nodes)
+
+    @staticmethod
+    def sort_key(sort: str, record: NodeRecord) -> Any:
+        """The value `record` is ordered by under `sort` (unknown hops sort last)."""
+        return SORT_KEYS[sort](record)
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Approximate memory held by the published records."""
+        nodes = self._snapshot.nodes
+        record_bytes = sum(record.memory_size() for record in nodes.values())
+        index_bytes = sum(sys.getsizeof(entries) for entries in self._snapshot.indexes.values())
+        return {
+            "records": len(nodes),
+            "record_bytes": record_bytes,
+            "bytes_per_record": round(record_bytes / len(nodes), 1) if nodes else 0,
+            # Each index entry is a (key, hash) tuple sharing the record's hash.
+            "index_bytes": index_bytes + len(nodes) * len(SORT_KEYS) * sys.getsizeof((0, "")),
+        }
+
+    def query(
+        self,
+        sort: str,
+        descending: bool = False,
+        limit: int = 50,
+        offset: int = 0,
+        after: Optional[IndexEntry] = None,
+        key_min: Any = None,
+        key_max: Any = None,
+        predicate: Optional[Callable[[NodeRecord], bool]] = None,
+    ) -> Tuple[RegistrySnapshot, List[NodeRecord], Optional[IndexEntry]]:
+        """
+        Return one page of records ordered by a secondary index.
+
+        `key_min`/`key_max` bound the sort key inclusively and are resolved
+        with a binary search; `after` is the last entry of the previous page.
+        Without a predicate a page costs O(log n + offset + limit).
+        Returns the snapshot used, the records and the cursor entry for the
+        next page (None when this page is the last one).
+        """
+        snapshot = self._snapshot
+        entries = snapshot.indexes[sort]
+
+        lo = 0 if key_min is None else bisect_left(entries, (key_min,))
+        hi = len(entries) if key_max is None else bisect_right(entries, (key_max, _HASH_MAX))
+        if after is not None:
+            if descending:
+                hi = min(hi, bisect_left(entries, tuple(after)))
+            else:
+                lo = max(lo, bisect_right(entries, tuple(after)))
+
+        if predicate is None and not descending:
+            window = entries[lo + offset:min(hi, lo + offset + limit + 1)]
+        elif predicate is None:
+            start = max(lo, hi - offset - limit - 1)
+            window = entries[start:max(lo, hi - offset)][::-1]
+        else:
+            window = None
+
+        if window is not None:
+            page = window[:limit]
+            has_more = len(window) > limit
+        else:
+            page = []
+            has_more = False
+            skipped = 0
+            positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+            for position in positions:
+                entry = entries[position]
+                if not predicate(snapshot.nodes[entry[1]]):
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                if len(page) == limit:
+                    has_more = True
+                    break
+                page.append(entry)
+
+        records = [snapshot.nodes[node_hash] for _, node_hash in page]
+        next_entry = page[-1] if has_more and page else None
+        return snapshot, records, next_entry
+
+    def changes_since(self, version: int, snapshot: Optional[RegistrySnapshot] = None) -> Optional[RegistryDelta]:
+        """
+        Describe what changed after `version`, up to `snapshot` (default: the
+        current one).
+
+        Returns None when the change log no longer reaches back that far (or
+        the version is from the future) and the caller needs a full listing.
+        """
+        snapshot = snapshot or self._snapshot
+        changes = list(self._changes)
+
+        if version == snapshot.version:
+            return RegistryDelta(snapshot.version, [], [], [])
+        if version > snapshot.version or not changes or changes[0][0] > version + 1:
+            return None
+
+        # The first event after `version` tells whether a node existed then.
+        first_event: Dict[str, str] = {}
+        for entry_version, added, changed, removed in changes:
+            if entry_version <= version or entry_version > snapshot.version:
+                continue
+            for kind, hashes in (("added", added), ("changed", changed), ("removed", removed)):
+                for node_hash in hashes:
+                    first_event.setdefault(node_hash, kind)
+
+        delta = RegistryDelta(snapshot.version, [], [], [])
+        for node_hash, kind in first_event.items():
+            existed = kind != "added"
+            if node_hash in snapshot.nodes:
+                (delta.changed if existed else delta.added).append(node_hash)
+            elif existed:
+                delta.removed.append(node_hash)
+        return delta
+
+    # ------------------------------------------------------------------ #
+    # Writers                                                            #
+    # ------------------------------------------------------------------ #
+
+    def modify(self, node_hash: str, update: Callable[[Optional[NodeRecord]], NodeRecord]) -> NodeRecord:
+        """
+        Stage a new record for a node.
+
+        `update` receives a private copy of the latest record (including any
+        unpublished change) or None, and returns the record to publish.
+        Published records are never mutated in place.
+        """
+        with self._write_lock:
+            current = self._pending[node_hash] if node_hash in self._pending else self._snapshot.nodes.get(node_hash)
+            record = update(current.copy() if current is not None else None)
+            self._pending[node_hash] = record
+            self._schedule_flush()
+            return record
+
+    def evict(self, max_count: int = -1, max_age: float = -1, now: Optional[float] = None) -> int:
+        """
+        Stage removal of nodes not seen for `max_age` seconds and of the
+        least recently seen nodes beyond `max_count` (-1 disables a limit).
+
+        Both limits are resolved on the last-seen index, so the cost is the
+        number of evicted nodes rather than the size of the registry.
+        """
+        entries = self._snapshot.indexes["last_seen"]
+        cut = 0
+        if max_age >= 0:
+            cut = bisect_left(entries, ((now if now is not None else time.time()) - max_age,))
+        if max_count >= 0:
+            cut = max(cut, len(entries) - max_count)
+        if cut <= 0:
+            return 0
+
+        evicted = 0
+        with self._write_lock:
+            for _, node_hash in entries[:cut]:
+                # A node with a staged update has just announced again.
+                if node_hash not in self._pending:
+                    self._pending[node_hash] = None
+                    evicted += 1
+            if evicted:
+                self.evicted += evicted
+                self._schedule_flush()
+        return evicted
+
+    def add_listener(self, listener: Callable[[RegistrySnapshot], None]) -> None:
+        """Call `listener` with every newly published snapshot."""
+        self._listeners.append(listener)
+
+    def remove(self, node_hash: str) -> None:
+        with self._write_lock:
+            self._pending[node_hash] = None
+            self._schedule_flush()
+
+    def flush(self) -> None:
+        """Publish all staged updates as one new snapshot."""
+        with self._write_lock:
+            self._flush_timer = None
+            if not self._pending:
+                return
+
+            nodes = dict(self._snapshot.nodes)
+            indexes = {name: list(entries) for name, entries in self._snapshot.indexes.items()}
+            added, changed, removed = set(), set(), set()
+            for node_hash, record in self._pending.items():
+                previous = nodes.get(node_hash)
+                _reindex(indexes, node_hash, previous, record)
+                if record is None:
+                    if nodes.pop(node_hash, None) is not None:
+                        removed.add(node_hash)
+                else:
+                    (changed if previous is not None else added).add(node_hash)
+                    nodes[node_hash] = record
+            self._pending = {}
+
+            version = self._snapshot.version + 1
+            self._changes.append((version, frozenset(added), frozenset(changed), frozenset(removed)))
+            snapshot = self._snapshot = RegistrySnapshot(version, MappingProxyType(nodes), indexes)
+
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as exc:
+                print(f"Registry listener error: {exc}")
+
+    def restore(self, version: int, nodes: Mapping[str, NodeRecord]) -> None:
+        """
+        Replace the registry contents with previously persisted records.
+
+        Meant for startup, before any announce is processed. The change log
+        starts empty, so clients holding an older version get a full listing.
+        """
+        with self._write_lock:
+            self._pending = {}
+            self._changes.clear()
+            self._snapshot = RegistrySnapshot(version, MappingProxyType(dict(nodes)), _build_indexes(nodes))
+
+    def _schedule_flush(self) -> None:
+        # Coalesce bursts of announces into one copy of the node table.
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.batch_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+
+def _build_indexes(nodes: Mapping[str, NodeRecord]) -> Dict[str, List[IndexEntry]]:
+    return {
+        name: sorted((key(record), node_hash) for node_hash, record in nodes.items())
+        for name, key in SORT_KEYS.items()
+    }
+
+
+def _reindex(
+    indexes: Dict[str, List[IndexEntry]],
+    node_hash: str,
+    previous: Optional[NodeRecord],
+    record: Optional[NodeRecord],
+) -> None:
+    """Move a node's entries in every sorted index from `previous` to `record`."""
+    for name, key in SORT_KEYS.items():
+        entries = indexes[name]
+        if previous is not None:
+            old_entry = (key(previous), node_hash)
+            position = bisect_left(entries, old_entry)
+            if position < len(entries) and entries[position] == old_entry:
+                del entries[position]
+        if record is not None:
+            insort(entries, (key(record), node_hash))
+
+
+__all__ = ["NodeRecord", "NodeRegistry", "RegistryDelta", "RegistrySnapshot", "SORT_KEYS"]
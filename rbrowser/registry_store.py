@@ -0,0 +1,181 @@
+"""
+On-disk persistence for the node registry.
+
+The registry is kept as a msgpack checkpoint plus an append-only log of the
+records changed by each published batch. Startup loads the checkpoint and
+replays the log, so the node list is back before Reticulum has finished
+connecting instead of waiting for announces to trickle in again.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import RNS.vendor.umsgpack as msgpack
+
+from .registry import NodeRecord, NodeRegistry, RegistrySnapshot
+
+
+STORE_FORMAT_VERSION = 2
+
+
+class RegistryStore:
+    """Checkpoint and change log for one `NodeRegistry`."""
+
+    def __init__(
+        self,
+        registry: NodeRegistry,
+        snapshot_path: Path,
+        log_path: Path,
+        checkpoint_every: int = 1000,
+    ) -> None:
+        self.registry = registry
+        self.snapshot_path = Path(snapshot_path)
+        self.log_path = Path(log_path)
+        self.checkpoint_every = checkpoint_every
+
+        self._lock = threading.Lock()
+        self._log_handle = None
+        self._log_entries = 0
+        self._written_version = 0
+
+    # ------------------------------------------------------------------ #
+    # Startup                                                            #
+    # ------------------------------------------------------------------ #
+
+    def restore(self) -> int:
+        """Load the checkpoint and log into the registry; returns the node count."""
+        started = time.perf_counter()
+        version, nodes = 0, {}
+        try:
+            version, nodes = self._load_checkpoint()
+        except Exception as exc:
+            print(f"⚠️ Node registry checkpoint could not be loaded: {exc}")
+
+        replayed = 0
+        try:
+            version, replayed = self._replay_log(version, nodes)
+        except Exception as exc:
+            print(f"⚠️ Node registry log could not be replayed: {exc}")
+
+        with self._lock:
+            self._written_version = version
+            self._log_entries = replayed
+        self.registry.restore(version, nodes)
+        self.registry.add_listener(self._on_published)
+
+        if nodes:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            print(f"📂 Restored {len(nodes)} nodes from disk in {elapsed_ms:.1f} ms ({replayed} log entries)")
+        return len(nodes)
+
+    def _load_checkpoint(self) -> Tuple[int, Dict[str, NodeRecord]]:
+        if not self.snapshot_path.exists():
+            return 0, {}
+
+        with self.snapshot_path.open("rb") as handle:
+            payload = msgpack.unpack(handle)
+
+        if not isinstance(payload, dict) or payload.get("format") != STORE_FORMAT_VERSION:
+            print("⚠️ Node registry checkpoint format changed, starting empty")
+            return 0, {}
+        nodes = {node_hash: NodeRecord.from_list(values) for node_hash, values in payload["nodes"].items()}
+        return payload["version"], nodes
+
+    def _replay_log(self, version: int, nodes: Dict[str, NodeRecord]) -> Tuple[int, int]:
+        if not self.log_path.exists():
+            return version, 0
+
+        replayed = 0
+        size = self.log_path.stat().st_size
+        with self.log_path.open("rb") as handle:
+            while True:
+                position = handle.tell()
+                try:
+                    entry_format, entry_version, records = msgpack.unpack(handle)
+                except (msgpack.UnpackException, TypeError, ValueError):
+                    break
+                # Entries at or below the checkpoint were already folded in.
+                if entry_format != STORE_FORMAT_VERSION or entry_version <= version:
+                    continue
+                for node_hash, values in records.items():
+                    if values is None:
+                        nodes.pop(node_hash, None)
+                    else:
+                        nodes[node_hash] = NodeRecord.from_list(values)
+                version = entry_version
+                replayed += 1
+
+        if position < size:
+            # A crash mid-append leaves a partial entry; drop it so later
+            # appends start on a clean boundary.
+            print(f"⚠️ Dropping {size - position} bytes of incomplete node registry log")
+            with self.log_path.open("r+b") as handle:
+                handle.truncate(position)
+        return version, replayed
+
+    # ------------------------------------------------------------------ #
+    # Writing                                                            #
+    # ------------------------------------------------------------------ #
+
+    def checkpoint(self, snapshot: Optional[RegistrySnapshot] = None) -> None:
+        """Write the full registry atomically and start a fresh log."""
+        snapshot = snapshot or self.registry.snapshot()
+        with self._lock:
+            if snapshot.version < self._written_version:
+                return
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.snapshot_path.with_suffix(".tmp")
+            with tmp_path.open("wb") as handle:
+                msgpack.pack(
+                    {
+                        "format": STORE_FORMAT_VERSION,
+                        "version": snapshot.version,
+                        "nodes": {node_hash: record.to_list() for node_hash, record in snapshot.nodes.items()},
+                    },
+                    handle,
+                )
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            if self._log_handle is not None:
+                self._log_handle.close()
+                self._log_handle = None
+            self.log_path.unlink(missing_ok=True)
+            self._log_entries = 0
+            self._written_version = snapshot.version
+
+    def _on_published(self, snapshot: RegistrySnapshot) -> None:
+        with self._lock:
+            if snapshot.version <= self._written_version:
+                return
+            # Listeners can run out of order when two flushes race, so log
+            # everything since the last written version, not just one batch.
+            delta = self.registry.changes_since(self._written_version, snapshot)
+            if delta is None:
+                needs_checkpoint = True
+            else:
+                records = {node_hash: snapshot.nodes[node_hash].to_list() for node_hash in delta.added + delta.changed}
+                records.update((node_hash, None) for node_hash in delta.removed)
+                self._append(snapshot.version, records)
+                needs_checkpoint = self._log_entries >= self.checkpoint_every
+
+        if needs_checkpoint:
+            self.checkpoint(snapshot)
+
+    def _append(self, version: int, records: Dict[str, Optional[List[Any]]]) -> None:
+        if self._log_handle is None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log_handle = self.log_path.open("ab")
+        self._log_handle.write(msgpack.packb([STORE_FORMAT_VERSION, version, records]))
+        self._log_handle.flush()
+        self._log_entries += 1
+        self._written_version = version
+
+
+__all__ = ["RegistryStore"]
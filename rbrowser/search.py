@@ -0,0 +1,601 @@
+"""
+Search helpers for the local page cache.
+
+Searching the cache means reading every cached page from disk, so the pages a
+query matched are memoised here and tied to the cache generation maintained by
+`CacheManager`. A repeated query only reads those pages again until the cache
+actually changes.
+
+`SearchIndex` keeps an inverted token index over the cached pages so a query
+only has to read the pages that can possibly match. Pages are identified by
+integer doc ids. Full (re)builds shard the node directories across a process
+pool; each shard numbers its pages from its own id range, so the parent can
+merge the per-shard segments without rewriting them.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import RNS.vendor.umsgpack as msgpack
+
+
+SearchKey = Tuple[str, str, int]
+
+# (node hash, page path relative to the node directory)
+SearchHit = Tuple[str, str]
+
+INDEX_FORMAT_VERSION = 2
+
+# Doc ids reserved for each shard of a full build.
+DOC_ID_STRIDE = 1 << 20
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class SearchResultCache:
+    """
+    Bounded LRU of search hits keyed on query, mode and limit.
+
+    Only the matching node and page ids are kept: the result fields that
+    depend on the time of the search (cache age and status) are rebuilt
+    when a hit is served.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[SearchKey, List[SearchHit]]" = OrderedDict()
+        self._generation: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self, query: str, mode: str, limit: int, generation: int) -> Optional[List[SearchHit]]:
+        """Return cached hits, or None when missing or stale."""
+        key = (query, mode, limit)
+        with self._lock:
+            self._sync_generation(generation)
+            hits = self._entries.get(key)
+            if hits is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return hits
+
+    def put(self, query: str, mode: str, limit: int, generation: int, hits: List[SearchHit]) -> None:
+        """Store hits computed against the given cache generation."""
+        key = (query, mode, limit)
+        with self._lock:
+            self._sync_generation(generation)
+            if self._generation != generation:
+                return
+
+            self._entries[key] = list(hits)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "generation": self._generation,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _sync_generation(self, generation: int) -> None:
+        # Hits only ever move forward with the cache: anything computed
+        # against an older generation is dropped wholesale.
+        if self._generation is None or generation > self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+
+# ---------------------------------------------------------------------- #
+# Inverted index                                                          #
+# ---------------------------------------------------------------------- #
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on; more index workers than this only add overhead."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def tokenize(text: str) -> Set[str]:
+    """Split text into the lowercase word tokens stored in the index."""
+    return set(_TOKEN_RE.findall(text.lower()))
+
+
+def _node_stamp(node_dir: Path) -> List[float]:
+    """Cheap fingerprint of a node directory: page count and newest mtime."""
+    count = 0
+    newest = 0.0
+    for page_file in _iter_node_pages(node_dir):
+        try:
+            newest = max(newest, page_file.stat().st_mtime)
+            count += 1
+        except OSError:
+            continue
+    return [float(count), newest]
+
+
+def _iter_node_pages(node_dir: Path):
+    index_file = node_dir / "index.mu"
+    if index_file.is_file():
+        yield index_file
+
+    pages_dir = node_dir / "pages"
+    if pages_dir.is_dir():
+        yield from (page for page in pages_dir.glob("*.mu") if page.is_file())
+
+
+def _doc_id(node_dir: Path, page_file: Path) -> str:
+    return f"{node_dir.name}/{page_file.relative_to(node_dir).as_posix()}"
+
+
+def _tokenize_node(node_dir: Path) -> Dict[str, Set[str]]:
+    """Return the token set of every cached page in a node directory."""
+    name_file = node_dir / "node_name.txt"
+    try:
+        name_terms = tokenize(name_file.read_text(encoding="utf-8", errors="ignore")) if name_file.exists() else set()
+    except OSError:
+        name_terms = set()
+
+    documents: Dict[str, Set[str]] = {}
+    for page_file in _iter_node_pages(node_dir):
+        try:
+            content = page_file.read_text(encoding="utf-8", errors="ignore")
+        except OSError:
+            continue
+        # Node names are matched alongside every page, so index them there.
+        documents[_doc_id(node_dir, page_file)] = tokenize(content) | name_terms
+    return documents
+
+
+def _build_segment(node_dirs: List[str], base: int = 0) -> Dict[str, Any]:
+    """
+    Index one shard of node directories.
+
+    Runs inside a worker process, so it only takes and returns plain data,
+    kept small because all of it is pickled back to the parent: pages get
+    integer doc ids counting up from `base`, postings are `array`s of those
+    ids (pickled as one bytes block each), and every occurrence of a term
+    is the same string object, so pickle writes it once.
+    """
+    docs: List[str] = []
+    postings: Dict[str, array] = {}
+    node_terms: Dict[str, List[str]] = {}
+    node_docs: Dict[str, List[int]] = {}
+    stamps: Dict[str, List[float]] = {}
+    canonical: Dict[str, str] = {}
+
+    for path in node_dirs:
+        node_dir = Path(path)
+        terms: Set[str] = set()
+        doc_ids: List[int] = []
+        for doc, doc_terms in _tokenize_node(node_dir).items():
+            doc_id = base + len(docs)
+            docs.append(doc)
+            doc_ids.append(doc_id)
+            terms |= doc_terms
+            for term in doc_terms:
+                ids = postings.get(term)
+                if ids is None:
+                    ids = postings[canonical.setdefault(term, term)] = array("I")
+                ids.append(doc_id)
+        node_terms[node_dir.name] = [canonical[term] for term in terms]
+        node_docs[node_dir.name] = doc_ids
+        stamps[node_dir.name] = _node_stamp(node_dir)
+
+    return {
+        "base": base,
+        "docs": docs,
+        "postings": postings,
+        "node_terms": node_terms,
+        "node_docs": node_docs,
+        "stamps": stamps,
+    }
+
+
+class SearchIndex:
+    """
+    Inverted token index over the page cache.
+
+    The index narrows a query down to candidate pages; the route still reads
+    those pages to confirm the match and build snippets, so the index only
+    needs to be a superset of the true matches.
+    """
+
+    # Below this many nodes a process pool costs more than it saves.
+    PARALLEL_THRESHOLD = 64
+
+    def __init__(self, cache_dir: Path, index_path: Path) -> None:
+        self.cache_dir = cache_dir
+        self.index_path = index_path
+
+        # term -> doc ids; doc id -> "<node hash>/<page path>"
+        self._postings: Dict[str, Set[int]] = {}
+        self._docs: Dict[int, str] = {}
+        self._node_terms: Dict[str, List[str]] = {}
+        self._node_docs: Dict[str, List[int]] = {}
+        self._stamps: Dict[str, List[float]] = {}
+        self._next_doc = 0
+        self._vocabulary: Optional[Tuple[List[str], List[int], str]] = None
+
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._building = False
+        self._changed_during_build: Set[str] = set()
+        self._dirty = False
+        self._last_save = 0.0
+        # Serialises writers, so the exit-time save waits for one in progress.
+        self._save_lock = threading.Lock()
+
+        self.ready = False
+        self.status: Dict[str, Any] = {"state": "idle"}
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle                                                          #
+    # ------------------------------------------------------------------ #
+
+    def start(self) -> None:
+        """Load the persisted index (or build one) in the background."""
+        threading.Thread(target=self._startup, daemon=True).start()
+
+    def rebuild(self, workers: Optional[int] = None) -> bool:
+        """Start a full re-index; returns False if one is already running."""
+        with self._lock:
+            if self._building:
+                return False
+            self._building = True
+        threading.Thread(target=self._rebuild, args=(workers,), daemon=True).start()
+        return True
+
+    def save(self) -> None:
+        """Persist the index atomically next to the cache directory."""
+        with self._lock:
+            # Doc ids as packed arrays and term lists as joined strings:
+            # umsgpack is pure Python and would otherwise pack every id and
+            # term one by one.
+            payload = {
+                "version": INDEX_FORMAT_VERSION,
+                "byteorder": sys.byteorder,
+                "postings": {term: array("I", docs).tobytes() for term, docs in self._postings.items()},
+                "docs": dict(self._docs),
+                "node_terms": {node: "\n".join(terms) for node, terms in self._node_terms.items()},
+                "node_docs": dict(self._node_docs),
+                "stamps": dict(self._stamps),
+                "next_doc": self._next_doc,
+            }
+            self._dirty = False
+            self._last_save = time.time()
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with tmp_path.open("wb") as handle:
+            msgpack.pack(payload, handle)
+        os.replace(tmp_path, self.index_path)
+
+    def save_if_dirty(self, min_interval: float = 60) -> None:
+        with self._save_lock:
+            if self._dirty and not self._building and time.time() - self._last_save >= min_interval:
+                try:
+                    self.save()
+                except Exception as exc:
+                    print(f"❌ Failed to save search index: {exc}")
+
+    # ------------------------------------------------------------------ #
+    # Incremental maintenance                                            #
+    # ------------------------------------------------------------------ #
+
+    def update_node(self, node_hash: str) -> None:
+        """Re-tokenise a single node after its cached pages changed."""
+        node_dir = self.cache_dir / node_hash
+        if not node_dir.is_dir():
+            self.remove_node(node_hash)
+            return
+
+        segment = _build_segment([str(node_dir)])
+        with self._lock:
+            self._remove_node_locked(node_hash)
+            self._merge_segment(segment, self._next_doc)
+            self._next_doc += len(segment["docs"])
+            if self._building:
+                self._changed_during_build.add(node_hash)
+            self._dirty = True
+
+    def remove_node(self, node_hash: str) -> None:
+        with self._lock:
+            self._remove_node_locked(node_hash)
+            if self._building:
+                self._changed_during_build.add(node_hash)
+            self._dirty = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings = {}
+            self._docs = {}
+            self._node_terms = {}
+            self._node_docs = {}
+            self._stamps = {}
+            self._vocabulary = None
+            if self._building:
+                self._changed_during_build.clear()
+            self._dirty = True
+
+    # ------------------------------------------------------------------ #
+    # Queries                                                            #
+    # ------------------------------------------------------------------ #
+
+    def candidates(self, query: str) -> Optional[Dict[str, Set[str]]]:
+        """
+        Map node hash -> candidate page paths (relative to the node dir).
+
+        Returns None when the index cannot answer (not ready yet, or a query
+        without any word characters) so callers fall back to a full scan.
+        """
+        words = set(_TOKEN_RE.findall(query.lower()))
+        if not words or not self.ready:
+            return None
+
+        with self._lock:
+            terms, offsets, blob = self._get_vocabulary()
+            matched_docs: Optional[Set[int]] = None
+
+            for word in words:
+                # Any word of a matching query is a substring of some token
+                # of the page, so union the postings of those tokens.
+                docs: Set[int] = set()
+                for match in re.finditer(re.escape(word), blob):
+                    term = terms[bisect_right(offsets, match.start()) - 1]
+                    docs |= self._postings.get(term, set())
+
+                matched_docs = docs if matched_docs is None else matched_docs & docs
+                if not matched_docs:
+                    return {}
+
+            result: Dict[str, Set[str]] = {}
+            for doc_id in matched_docs or ():
+                node_hash, _, page = self._docs[doc_id].partition("/")
+                result.setdefault(node_hash, set()).add(page)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.status)
+            stats.update({"ready": self.ready, "nodes": len(self._node_terms), "terms": len(self._postings)})
+            return stats
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers                                                   #
+    # ------------------------------------------------------------------ #
+
+    def _startup(self) -> None:
+        with self._build_lock:
+            self.status = {"state": "loading"}
+            try:
+                if self._load():
+                    self._reconcile()
+                    self.ready = True
+                    self.status = {"state": "ready", "finished_at": time.time()}
+                    print(f"🔎 Search index loaded ({len(self._node_terms)} nodes, {len(self._postings)} terms)")
+                    return
+            except Exception as exc:
+                print(f"⚠️ Search index could not be loaded, rebuilding: {exc}")
+
+        # No-op when an explicit re-index is already queued behind the load.
+        self.rebuild()
+
+    def _load(self) -> bool:
+        if not self.index_path.exists():
+            return False
+
+        with self.index_path.open("rb") as handle:
+            payload = msgpack.unpack(handle)
+
+        if not isinstance(payload, dict) or payload.get("version") != INDEX_FORMAT_VERSION:
+            print("🔎 Search index format changed, a full re-index is required")
+            return False
+
+        swap = payload.get("byteorder") != sys.byteorder
+
+        def ids(packed: bytes) -> array:
+            unpacked = array("I", packed)
+            if swap:
+                unpacked.byteswap()
+            return unpacked
+
+        with self._lock:
+            self._postings = {term: set(ids(docs)) for term, docs in payload["postings"].items()}
+            self._docs = dict(payload["docs"])
+            self._node_terms = {
+                node: terms.split("\n") if terms else [] for node, terms in payload["node_terms"].items()
+            }
+            self._node_docs = dict(payload["node_docs"])
+            self._stamps = dict(payload["stamps"])
+            self._next_doc = payload["next_doc"]
+            self._vocabulary = None
+        return True
+
+    def _reconcile(self) -> None:
+        """Re-index nodes whose pages changed while the index was on disk."""
+        on_disk = {node_dir.name: node_dir for node_dir in _list_node_dirs(self.cache_dir)}
+
+        for node_hash in set(self._node_terms) - set(on_disk):
+            self.remove_node(node_hash)
+
+        for node_hash, node_dir in on_disk.items():
+            if self._stamps.get(node_hash) != _node_stamp(node_dir):
+                self.update_node(node_hash)
+
+    def _rebuild(self, workers: Optional[int]) -> None:
+        with self._build_lock:
+            self._building = True
+            self._changed_during_build = set()
+            try:
+                self._run_build(workers)
+            except Exception as exc:
+                self.status = {"state": "failed", "error": str(exc), "finished_at": time.time()}
+                print(f"❌ Search index rebuild failed: {exc}")
+            finally:
+                self._building = False
+
+    def _run_build(self, workers: Optional[int]) -> None:
+        node_dirs = sorted(str(node_dir) for node_dir in _list_node_dirs(self.cache_dir))
+        workers = max(1, min(workers or available_cpus(), available_cpus()))
+        if len(node_dirs) < self.PARALLEL_THRESHOLD:
+            workers = 1
+
+        # Several shards per worker keeps the pool busy when node sizes vary.
+        shard_count = max(1, min(len(node_dirs), workers * 4))
+        shards = [node_dirs[i::shard_count] for i in range(shard_count)]
+
+        started_at = time.time()
+        self.status = {
+            "state": "building",
+            "workers": workers,
+            "nodes_total": len(node_dirs),
+            "nodes_done": 0,
+            "shards_total": len(shards),
+            "shards_done": 0,
+            "started_at": started_at,
+        }
+        print(f"🔎 Building search index over {len(node_dirs)} nodes with {workers} worker(s)...")
+
+        postings: Dict[str, Set[int]] = {}
+        docs: Dict[int, str] = {}
+        node_terms: Dict[str, List[str]] = {}
+        node_docs: Dict[str, List[int]] = {}
+        stamps: Dict[str, List[float]] = {}
+
+        def merge(shard: List[str], segment: Dict[str, Any]) -> None:
+            # Shard doc ids are already unique, so this is set and dict
+            # updates only.
+            for term, ids in segment["postings"].items():
+                existing = postings.get(term)
+                if existing is None:
+                    postings[term] = set(ids)
+                else:
+                    existing.update(ids)
+            docs.update(zip(range(segment["base"], segment["base"] + len(segment["docs"])), segment["docs"]))
+            node_terms.update(segment["node_terms"])
+            node_docs.update(segment["node_docs"])
+            stamps.update(segment["stamps"])
+            self.status["shards_done"] += 1
+            self.status["nodes_done"] += len(shard)
+
+        bases = [index * DOC_ID_STRIDE for index in range(len(shards))]
+        if workers == 1:
+            for shard, base in zip(shards, bases):
+                merge(shard, _build_segment(shard, base))
+        else:
+            try:
+                # Spawned rather than forked: this process runs Reticulum,
+                # the web server and cache threads, and a forked child could
+                # inherit one of their locks while it is held.
+                context = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                    futures = {pool.submit(_build_segment, shard, base): shard for shard, base in zip(shards, bases)}
+                    for future in as_completed(futures):
+                        merge(futures[future], future.result())
+            except (OSError, RuntimeError) as exc:
+                print(f"⚠️ Process pool unavailable ({exc}), indexing in-process")
+                for table in (postings, docs, node_terms, node_docs, stamps):
+                    table.clear()
+                self.status.update({"workers": 1, "nodes_done": 0, "shards_done": 0})
+                for shard, base in zip(shards, bases):
+                    merge(shard, _build_segment(shard, base))
+
+        with self._lock:
+            self._postings = postings
+            self._docs = docs
+            self._node_terms = node_terms
+            self._node_docs = node_docs
+            self._stamps = stamps
+            self._next_doc = len(shards) * DOC_ID_STRIDE
+            self._vocabulary = None
+            changed = set(self._changed_during_build)
+
+        # Pages written while the shards were being read would otherwise be
+        # lost when the freshly built tables are swapped in.
+        for node_hash in changed:
+            self.update_node(node_hash)
+
+        self.ready = True
+        duration = time.time() - started_at
+        self.status.update({"state": "ready", "finished_at": time.time(), "duration": duration})
+        print(f"🔎 Search index built: {len(node_terms)} nodes, {len(postings)} terms in {duration:.1f}s")
+        with self._save_lock:
+            self.save()
+
+    def _merge_segment(self, segment: Dict[str, Any], offset: int) -> None:
+        """Merge a segment built from doc id 0, moving its ids up by `offset`."""
+        for term, ids in segment["postings"].items():
+            if term not in self._postings:
+                self._vocabulary = None
+            self._postings.setdefault(term, set()).update(doc_id + offset for doc_id in ids)
+        for index, doc in enumerate(segment["docs"]):
+            self._docs[index + offset] = doc
+        self._node_terms.update(segment["node_terms"])
+        for node, ids in segment["node_docs"].items():
+            self._node_docs[node] = [doc_id + offset for doc_id in ids]
+        self._stamps.update(segment["stamps"])
+
+    def _remove_node_locked(self, node_hash: str) -> None:
+        doc_ids = set(self._node_docs.pop(node_hash, ()))
+        for term in self._node_terms.pop(node_hash, ()):
+            docs = self._postings.get(term)
+            if docs is None:
+                continue
+            docs -= doc_ids
+            if not docs:
+                del self._postings[term]
+                self._vocabulary = None
+        for doc_id in doc_ids:
+            self._docs.pop(doc_id, None)
+        self._stamps.pop(node_hash, None)
+
+    def _get_vocabulary(self) -> Tuple[List[str], List[int], str]:
+        # Terms are joined into one newline separated blob so substring
+        # lookups over the whole vocabulary run inside the regex engine.
+        if self._vocabulary is None:
+            terms = sorted(self._postings)
+            offsets: List[int] = []
+            position = 0
+            for term in terms:
+                offsets.append(position)
+                position += len(term) + 1
+            self._vocabulary = (terms, offsets, "\n".join(terms))
+        return self._vocabulary
+
+
+def _list_node_dirs(cache_dir: Path) -> List[Path]:
+    if not cache_dir.exists():
+        return []
+    return [node_dir for node_dir in cache_dir.iterdir() if node_dir.is_dir()]
+
+
+__all__ = ["INDEX_FORMAT_VERSION", "SearchIndex", "SearchResultCache", "available_cpus", "tokenize"]
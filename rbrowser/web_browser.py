@@ -7,27 +7,61 @@ information about nodes, and exposes helpers used by the Flask API.
 
 from __future__ import annotations
 
+import atexit
+import json
 import os
 import sys
 import threading
 import time
-from datetime import datetime
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 import RNS
 import RNS.vendor.umsgpack as msgpack
 
+from .announces import AnnounceLog
 from .cache import CacheManager
-from .nomadnet import NomadNetAnnounceHandler, NomadNetBrowser, NomadNetFileBrowser, _clean_hash
-
+from .downloads import DownloadManager
+from .events import EventBus
+from .file_cache import FileCache
+from .memo import Generations, ResponseMemo
+from .nomadnet import DestinationCache, NomadNetAnnounceHandler, NomadNetBrowser, NomadNetFileBrowser, _clean_hash
+from .paths import PathMonitor
+from .prefetch import Prefetcher
+from .prewarm import PathWarmer
+from .reachability import ReachabilityMonitor
+from .priority import PriorityGate
+from .registry import NodeRegistry, NodeRecord
+from .registry_store import RegistryStore
+
+
+FAVORITES_FILE = Path("settings") / "favorites.json"
 
 class NomadNetWebBrowser:
     """Main controller for rBrowser runtime state."""
 
+    # Serialised node lists are reused for this long within one registry
+    # version; only the relative "last seen" strings go stale meanwhile.
+    NODES_BODY_TTL = 15.0
+    # Seconds between checks for nodes past the configured maximum age.
+    NODE_EVICTION_INTERVAL = 300.0
+
     def __init__(self) -> None:
+        # Created first: every other component publishes into it.
+        self.events = EventBus()
+        # Change counters for the state small JSON responses are built from;
+        # see `ResponseMemo`.
+        self.generations = Generations()
+        self.responses = ResponseMemo(self.generations)
+
         self.reticulum: Optional[RNS.Reticulum] = None
         self.identity: Optional[RNS.Identity] = None
-        self.nomadnet_nodes: Dict[str, Dict[str, Any]] = {}
+        # Announced nodes, published as lock-free snapshots for the API.
+        self.registry = NodeRegistry()
+        self.registry.add_listener(self._on_registry_published)
+        self.generations.register("registry", lambda: self.registry.version)
+        self.path_monitor = PathMonitor(self)
         self.running = False
         self.announce_count = 0
         self.start_time = time.time()
@@ -35,15 +69,52 @@ class NomadNetWebBrowser:
         self.connection_state = "initializing"
         self.reticulum_ready = False
 
-        self._status_cache: Optional[Dict[str, Any]] = None
-        self._status_cache_time: Optional[float] = None
-        self._cache_lock = threading.Lock()
-        self.cache_duration = 1.0
+        # Kept in memory; written through to FAVORITES_FILE on save.
+        self.favorites: List[Dict[str, Any]] = self._load_favorites()
 
-        self.nomadnet_cached_links: Dict[bytes, RNS.Link] = {}
+        self._nodes_body: Optional[Tuple[Tuple[int, int], str, bytes]] = None
+        self._nodes_delta_bodies: "OrderedDict[Tuple[int, int], Tuple[str, bytes]]" = OrderedDict()
+        self._nodes_body_lock = threading.Lock()
+
+        # Open links by destination, least recently used first.
+        self.nomadnet_cached_links: "OrderedDict[bytes, RNS.Link]" = OrderedDict()
+        self._links_lock = threading.Lock()
+        # Identities and outgoing destinations, filled from announces.
+        self.destinations = DestinationCache()
+        # User requests go ahead of background cache fetches.
+        self.priority = PriorityGate()
 
         # Cache manager handles all caching concerns and background work.
         self.cache = CacheManager(self)
+        self.generations.register("cache", lambda: self.cache.generation)
+
+        # Bring back the node list from the last run before Reticulum starts.
+        cache_root = self.cache.cache_dir.parent
+        self.registry_store = RegistryStore(
+            self.registry,
+            cache_root / "node_registry.msgpack",
+            cache_root / "node_registry.log",
+        )
+        self.registry_store.restore()
+        atexit.register(self.registry_store.checkpoint)
+
+        self.announce_log = AnnounceLog(cache_root / "announce_log.bin")
+        try:
+            self.announce_log.load()
+        except Exception as exc:
+            print(f"⚠️ Announce log could not be loaded: {exc}")
+        atexit.register(self.announce_log.spill)
+
+        # Downloads are spooled here and run on a fixed worker pool.
+        self.download_dir = cache_root / "downloads"
+        self.downloads = DownloadManager(self, self.download_dir)
+        self.downloads.load()
+        self.file_cache = FileCache(cache_root / "files", self.cache_settings["file_cache_size_mb"] * 1024 * 1024)
+        self.file_cache.load()
+        atexit.register(self.file_cache.save_if_dirty, 0)
+        self.prefetcher = Prefetcher(self)
+        self.prewarmer = PathWarmer(self)
+        self.reachability = ReachabilityMonitor(self)
 
         print("=" * 90)
         print("🌐 rBrowser v1.0 - Standalone Nomadnet Browser - https://github.com/fr33n0w/rBrowser")
@@ -59,6 +130,23 @@ class NomadNetWebBrowser:
     # Convenience properties                                             #
     # ------------------------------------------------------------------ #
 
+    @property
+    def connection_state(self) -> str:
+        return self._connection_state
+
+    @connection_state.setter
+    def connection_state(self, state: str) -> None:
+        changed = state != getattr(self, "_connection_state", None)
+        self._connection_state = state
+        if changed:
+            self.generations.bump("connection")
+            self.events.publish("connection", {"state": state})
+
+    @property
+    def nomadnet_nodes(self) -> Mapping[str, NodeRecord]:
+        """Read-only view of the latest published node registry snapshot."""
+        return self.registry.snapshot().nodes
+
     @property
     def cache_settings(self) -> Dict[str, Any]:
         return self.cache.settings
@@ -69,6 +157,25 @@ class NomadNetWebBrowser:
 
     def save_cache_settings(self) -> None:
         self.cache.save_settings()
+        self.generations.bump("settings")
+
+    def save_favorites(self, favorites: List[Dict[str, Any]]) -> None:
+        """Replace the favorites and write them to disk."""
+        FAVORITES_FILE.parent.mkdir(exist_ok=True)
+        with FAVORITES_FILE.open("w") as handle:
+            json.dump(favorites, handle, indent=2)
+        self.favorites = favorites
+        self.generations.bump("favorites")
+        self.prewarmer.wake()
+
+    @staticmethod
+    def _load_favorites() -> List[Dict[str, Any]]:
+        try:
+            text = FAVORITES_FILE.read_text() if FAVORITES_FILE.exists() else ""
+            return json.loads(text) if text.strip() else []
+        except Exception as exc:
+            print(f"⚠️ Could not read favorites: {exc}")
+            return []
 
     # ------------------------------------------------------------------ #
     # Reticulum initialisation                                           #
@@ -154,24 +261,27 @@ class NomadNetWebBrowser:
             print(f"Filtered test node: {hash_str[:16]} -> {node_name}")
             return
 
-        node_entry = self.nomadnet_nodes.setdefault(
-            hash_str,
-            {
-                "hash": clean_hash_str,
-                "name": node_name,
-                "last_seen": datetime.now().isoformat(),
-                "announce_count": self.announce_count,
-                "node_announce_count": 0,
-                "app_data_length": len(app_data) if app_data else 0,
-                "last_seen_relative": "Just now",
-            },
-        )
+        announce_count = self.announce_count
+        seen_at = time.time()
+        # An announce usually comes with a fresh path, so refresh it here
+        # rather than on every node list poll.
+        path_info = self.path_monitor.path_info(clean_hash_str)
+
+        def update(node_entry: Optional[NodeRecord]) -> NodeRecord:
+            if node_entry is None:
+                node_entry = NodeRecord(clean_hash_str, announce_count=announce_count)
 
-        node_entry["node_announce_count"] += 1
-        node_entry["name"] = node_name
-        node_entry["last_seen"] = datetime.now().isoformat()
-        node_entry["app_data_length"] = len(app_data) if app_data else 0
-        node_entry["last_seen_relative"] = "Just now"
+            node_entry.node_announce_count += 1
+            node_entry.name = node_name
+            node_entry.last_seen_ts = seen_at
+            node_entry.app_data_length = len(app_data) if app_data else 0
+            node_entry.hops = path_info["hops"]
+            node_entry.next_hop_interface = path_info["next_hop_interface"]
+            return node_entry
+
+        node_entry = self.registry.modify(clean_hash_str, update)
+        self.destinations.learn(destination_hash, announced_identity)
+        self.announce_log.record(clean_hash_str, seen_at, node_entry.app_data_length, node_entry.hops)
 
         if self.connection_state == "connected":
             self.connection_state = "active"
@@ -180,11 +290,22 @@ class NomadNetWebBrowser:
         print(
             "🌐 NomadNet Announce #"
             f"{self.announce_count}: {clean_hash_str} -> {node_name} "
-            f"(node announces: {node_entry['node_announce_count']})"
+            f"(node announces: {node_entry.node_announce_count})"
         )
 
         self.cache.schedule_node(clean_hash_str, node_name)
 
+    def _on_registry_published(self, snapshot) -> None:
+        max_count = self.cache_settings.get("node_max_count", -1)
+        if 0 <= max_count < len(snapshot.nodes):
+            self.registry.evict(max_count=max_count)
+        # Clients fetch the actual changes with /api/nodes?since=<version>.
+        self.events.publish("nodes", {"version": snapshot.version, "node_count": len(snapshot.nodes)})
+        self.events.publish(
+            "status",
+            {"total_announces": self.announce_count, "unique_nodes": len(snapshot.nodes)},
+        )
+
     @staticmethod
     def _decode_node_name(app_data: Optional[bytes], hash_str: str) -> str:
         if app_data:
@@ -204,74 +325,275 @@ class NomadNetWebBrowser:
     # Cache-aware helpers                                                #
     # ------------------------------------------------------------------ #
 
-    def get_cached_status(self) -> Dict[str, Any]:
-        """Return cached status information used by the status API."""
-        with self._cache_lock:
-            now = time.time()
-
-            if (
-                self._status_cache is not None
-                and self._status_cache_time is not None
-                and now - self._status_cache_time < self.cache_duration
-            ):
-                return self._status_cache
-
-            app_uptime = now - self.start_time
-            has_nodes = bool(self.nomadnet_nodes)
-            time_since_last_announce = (
-                now - self.last_announce_time if self.last_announce_time else None
-            )
-
-            self._status_cache = {
-                "app_uptime": app_uptime,
-                "has_nodes": has_nodes,
-                "time_since_last_announce": time_since_last_announce,
-                "node_count": len(self.nomadnet_nodes),
-                "announce_count": self.announce_count,
-                "connection_state": getattr(self, "connection_state", "connected"),
-                "reticulum_ready": getattr(self, "reticulum_ready", False),
+    def get_status_data(self) -> Dict[str, Any]:
+        """Return the inputs of the connection status shown in the status bar."""
+        now = time.time()
+        node_count = len(self.registry)
+        return {
+            "app_uptime": now - self.start_time,
+            "has_nodes": bool(node_count),
+            "time_since_last_announce": now - self.last_announce_time if self.last_announce_time else None,
+            "node_count": node_count,
+            "announce_count": self.announce_count,
+            "connection_state": getattr(self, "connection_state", "connected"),
+            "reticulum_ready": getattr(self, "reticulum_ready", False),
+        }
+
+    def get_nodes(self) -> List[Dict[str, Any]]:
+        """
+        Return all node records ready for serialisation.
+
+        Path info is maintained on the records by `PathMonitor`, so the only
+        per-request work is the relative timestamp.
+        """
+        now = time.time()
+        return [self.node_json(record, now) for record in self.nomadnet_nodes.values()]
+
+    def get_nodes_body(self) -> Tuple[str, bytes]:
+        """
+        Return the ETag and serialised JSON of the full node list.
+
+        The body is built once per registry version (and TTL bucket) and then
+        shared by every client.
+        """
+        snapshot = self.registry.snapshot()
+        now = time.time()
+        key = (snapshot.version, int(now // self.NODES_BODY_TTL))
+
+        with self._nodes_body_lock:
+            if self._nodes_body is not None and self._nodes_body[0] == key:
+                return self._nodes_body[1], self._nodes_body[2]
+
+        nodes = [self.node_json(record, now) for record in snapshot.nodes.values()]
+        etag = f"nodes-{key[0]}-{key[1]}"
+        body = json.dumps(nodes, separators=(",", ":")).encode("utf-8")
+
+        with self._nodes_body_lock:
+            self._nodes_body = (key, etag, body)
+        return etag, body
+
+    def get_nodes_delta_body(self, since: int) -> Tuple[str, bytes]:
+        """
+        Return the ETag and serialised JSON of the changes after `since`.
+
+        Clients that are too far behind the change log get the full list
+        with `"full": true`. Records are sent without `last_seen_relative`;
+        clients derive it from `last_seen_ts`.
+        """
+        snapshot = self.registry.snapshot()
+        key = (since, snapshot.version)
+
+        with self._nodes_body_lock:
+            cached = self._nodes_delta_bodies.get(key)
+            if cached is not None:
+                self._nodes_delta_bodies.move_to_end(key)
+                return cached
+
+        delta = self.registry.changes_since(since, snapshot)
+        if delta is None:
+            payload: Dict[str, Any] = {
+                "version": snapshot.version,
+                "full": True,
+                "nodes": [record.to_dict() for record in snapshot.nodes.values()],
             }
-            self._status_cache_time = now
-            return self._status_cache
-
-    def get_nodes(self):
-        current_time = datetime.now()
-        for node in self.nomadnet_nodes.values():
-            last_seen = datetime.fromisoformat(node["last_seen"])
-            diff = current_time - last_seen
-
-            if diff.total_seconds() < 60:
-                node["last_seen_relative"] = "Just now"
-            elif diff.total_seconds() < 3600:
-                minutes = int(diff.total_seconds() / 60)
-                node["last_seen_relative"] = f"{minutes}m ago"
-            else:
-                hours = int(diff.total_seconds() / 3600)
-                node["last_seen_relative"] = f"{hours}h ago"
+        else:
+            payload = {
+                "version": snapshot.version,
+                "full": False,
+                "added": [snapshot.nodes[node_hash].to_dict() for node_hash in delta.added],
+                "changed": [snapshot.nodes[node_hash].to_dict() for node_hash in delta.changed],
+                "removed": delta.removed,
+            }
+
+        entry = (f"nodes-{since}-{snapshot.version}", json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        with self._nodes_body_lock:
+            self._nodes_delta_bodies[key] = entry
+            while len(self._nodes_delta_bodies) > 32:
+                self._nodes_delta_bodies.popitem(last=False)
+        return entry
 
-        return list(self.nomadnet_nodes.values())
+    @classmethod
+    def node_json(cls, record: NodeRecord, now: float) -> Dict[str, Any]:
+        """A node record as served by the API, with its relative "last seen" time."""
+        data = record.to_dict()
+        data["last_seen_relative"] = cls._format_relative(now - record.last_seen_ts)
+        return data
+
+    @staticmethod
+    def _format_relative(seconds: float) -> str:
+        if seconds < 60:
+            return "Just now"
+        if seconds < 3600:
+            return f"{int(seconds / 60)}m ago"
+        return f"{int(seconds / 3600)}h ago"
 
     # ------------------------------------------------------------------ #
     # Page & file access                                                 #
     # ------------------------------------------------------------------ #
 
-    def fetch_file(self, node_hash: str, file_path: str, progress_callback=None) -> Dict[str, Any]:
-        """Fetch a file from a NomadNet node with optional progress tracking."""
+    def fetch_file(
+        self,
+        node_hash: str,
+        file_path: str,
+        progress_callback=None,
+        dest_path: Optional[str] = None,
+        use_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Fetch a file from a NomadNet node, optionally spooling it to `dest_path`.
+
+        The local file cache is consulted first unless `use_cache` is False;
+        successful network fetches are added to it.
+        """
+        caching = use_cache and self.cache_settings.get("file_cache_enabled", True)
+        if caching:
+            revalidate_hours = self.cache_settings.get("file_cache_revalidate_hours", -1)
+            entry = self.file_cache.lookup(
+                node_hash, file_path, revalidate_hours * 3600 if revalidate_hours >= 0 else -1
+            )
+            if entry is not None:
+                response = {"status": "success", "error": None, "cached": True, "fetched_at": entry["fetched_at"]}
+                try:
+                    if dest_path is not None:
+                        self.file_cache.materialize(entry, dest_path)
+                        response.update(content=b"", path=dest_path, size=entry["size"])
+                    else:
+                        response["content"] = self.file_cache.read(entry)
+                except FileNotFoundError:
+                    # Evicted since the lookup; fetch it from the node instead.
+                    print(f"📦 {file_path} left the file cache before it could be served; fetching it")
+                else:
+                    print(f"📦 {file_path} from {node_hash[:16]}... served from the file cache ({entry['size']} bytes)")
+                    if progress_callback:
+                        progress_callback(1.0)
+                    return response
+
+        if self.is_offline():
+            return {"error": "Offline: file is not in the local cache", "content": b"", "status": "error", "offline": True}
+
         try:
             print(f"📁 NomadNetWebBrowser.fetch_file called: {file_path} from {node_hash[:16]}...")
             browser = NomadNetFileBrowser(self, node_hash)
-            return browser.fetch_file(file_path, progress_callback=progress_callback)
+            with self.priority.interactive(node_hash, self.node_interface(node_hash)):
+                response = browser.fetch_file(file_path, progress_callback=progress_callback, dest_path=dest_path)
+            if caching and response["status"] == "success":
+                try:
+                    if dest_path is not None:
+                        self.file_cache.store(node_hash, file_path, dest_path)
+                    elif response["content"]:
+                        self.file_cache.store_bytes(node_hash, file_path, response["content"])
+                except Exception as exc:
+                    print(f"❌ Failed to cache {file_path}: {exc}")
+            return response
         except Exception as exc:
             print(f"❌ File fetch failed: {exc}")
             return {"error": f"File fetch failed: {exc}", "content": b"", "status": "error"}
 
+    def open_page(
+        self,
+        node_hash: str,
+        page_path: str = "/page/index.mu",
+        form_data: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Fetch a page the user opened, preferring a prefetched copy.
+
+        A prefetched hit records the visit, as `fetch_page` does. Like a
+        network fetch, it is not written to the page cache, which is filled
+        by the background cache worker.
+        """
+        prefetched = None if form_data else self.prefetcher.lookup(node_hash, page_path)
+        if prefetched is None:
+            return self.fetch_page(node_hash, page_path, form_data)
+        print("🔮 Serving prefetched page")
+        self.prewarmer.note_visit(node_hash)
+        return {"content": prefetched, "status": "success", "error": None, "prefetched": True}
+
     def fetch_page(
         self,
         node_hash: str,
         page_path: str = "/page/index.mu",
         form_data: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        """Fetch a NomadNet page, reusing cached links whenever possible."""
+        """
+        Fetch a NomadNet page, reusing cached links whenever possible.
+
+        In offline mode, or in "auto" mode when the network or the node is
+        unreachable, the page comes from the local cache without waiting for
+        a path; such responses carry `"offline": True` and `cached_at`.
+        """
+        self.prewarmer.note_visit(node_hash)
+        mode = self.cache_settings.get("offline_mode", "auto")
+        if self.is_offline():
+            if form_data:
+                return {
+                    "error": "Offline",
+                    "content": "Forms cannot be submitted offline",
+                    "status": "error",
+                    "offline": True,
+                }
+            return self._offline_page(node_hash, page_path, "offline mode" if mode == "on" else "network down")
+        if mode == "auto" and not form_data and self._node_unreachable(node_hash):
+            return self._offline_page(node_hash, page_path, "node unreachable")
+
+        with self.priority.interactive(node_hash, self.node_interface(node_hash)):
+            response = self._fetch_page(node_hash, page_path, form_data)
+
+        if response["status"] != "success" and mode == "auto" and not form_data:
+            fallback = self._offline_page(node_hash, page_path, "fetch failed")
+            if fallback["status"] == "success":
+                fallback["live_error"] = response.get("error")
+                return fallback
+        return response
+
+    # ------------------------------------------------------------------ #
+    # Offline mode                                                       #
+    # ------------------------------------------------------------------ #
+
+    def is_offline(self) -> bool:
+        """True when requests must be answered from the local cache."""
+        mode = self.cache_settings.get("offline_mode", "auto")
+        if mode == "on":
+            return True
+        return mode == "auto" and not self._network_available()
+
+    def _network_available(self) -> bool:
+        if not self.reticulum_ready or self.connection_state == "failed":
+            return False
+        return any(getattr(interface, "online", False) for interface in RNS.Transport.interfaces)
+
+    def _node_unreachable(self, node_hash: str) -> bool:
+        """No path and the reachability monitor has the node down."""
+        state = self.reachability.status(node_hash)
+        return state == "down" and not RNS.Transport.has_path(_clean_hash(node_hash))
+
+    def _offline_page(self, node_hash: str, page_path: str, reason: str) -> Dict[str, Any]:
+        cached = self.cache.read_cached_page(node_hash, page_path)
+        if cached is None:
+            print(f"📴 {page_path} from {node_hash[:16]}... is not cached ({reason})")
+            return {
+                "error": "Offline",
+                "content": f"Page not available offline ({reason}) and not in the local cache",
+                "status": "error",
+                "offline": True,
+                "offline_reason": reason,
+            }
+        print(f"📴 Serving cached {page_path} from {node_hash[:16]}... ({reason})")
+        return {
+            "content": cached["content"],
+            "status": "success",
+            "error": None,
+            "offline": True,
+            "offline_reason": reason,
+            "cached_at": cached["cached_at"],
+        }
+
+    def _fetch_page(
+        self,
+        node_hash: str,
+        page_path: str,
+        form_data: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
         try:
             print(f"Fetching {page_path} from {node_hash[:16]}...")
             destination_hash = _clean_hash(node_hash)
@@ -279,6 +601,7 @@ class NomadNetWebBrowser:
             cached_link = self.nomadnet_cached_links.get(destination_hash)
             if cached_link and cached_link.status == RNS.Link.ACTIVE:
                 print("Using existing cached link for page request")
+                self._touch_link(destination_hash)
                 return self._request_via_cached_link(cached_link, page_path, form_data)
 
             print("Creating new browser instance (no cached link available)")
@@ -286,7 +609,7 @@ class NomadNetWebBrowser:
             response = browser.fetch_page(page_path, form_data)
 
             if response["status"] == "success" and getattr(browser, "link", None):
-                self.nomadnet_cached_links[destination_hash] = browser.link
+                self.remember_link(destination_hash, browser.link)
                 print("Stored new link in cache")
 
             return response
@@ -295,6 +618,51 @@ class NomadNetWebBrowser:
             print(f"Fetch failed: {exc}")
             return {"error": f"Fetch failed: {exc}", "content": "", "status": "error"}
 
+    # ------------------------------------------------------------------ #
+    # Link pool                                                          #
+    # ------------------------------------------------------------------ #
+
+    def remember_link(self, destination_hash: bytes, link: RNS.Link) -> None:
+        """Keep a link open for reuse, closing the least recently used beyond the pool size."""
+        pool_size = int(self.cache_settings.get("link_pool_size", 16))
+        with self._links_lock:
+            self.nomadnet_cached_links.pop(destination_hash, None)
+            self.nomadnet_cached_links[destination_hash] = link
+            self._prune_links_locked()
+            while 0 <= pool_size < len(self.nomadnet_cached_links):
+                _, oldest = self.nomadnet_cached_links.popitem(last=False)
+                oldest.teardown()
+
+    def has_open_link(self, destination_hash: bytes) -> bool:
+        link = self.nomadnet_cached_links.get(destination_hash)
+        return link is not None and link.status == RNS.Link.ACTIVE
+
+    def link_pool_has_room(self) -> bool:
+        pool_size = int(self.cache_settings.get("link_pool_size", 16))
+        return pool_size < 0 or self.open_link_count() < pool_size
+
+    def open_link_count(self) -> int:
+        with self._links_lock:
+            self._prune_links_locked()
+            return len(self.nomadnet_cached_links)
+
+    def _touch_link(self, destination_hash: bytes) -> None:
+        with self._links_lock:
+            if destination_hash in self.nomadnet_cached_links:
+                self.nomadnet_cached_links.move_to_end(destination_hash)
+
+    def _prune_links_locked(self) -> None:
+        for destination_hash, link in list(self.nomadnet_cached_links.items()):
+            if link.status == RNS.Link.CLOSED:
+                del self.nomadnet_cached_links[destination_hash]
+
+    def request_over_open_link(self, node_hash: str, page_path: str) -> Optional[Dict[str, Any]]:
+        """Request a page only if a link to the node is already up; None otherwise."""
+        link = self.nomadnet_cached_links.get(_clean_hash(node_hash))
+        if link is None or link.status != RNS.Link.ACTIVE:
+            return None
+        return self._request_via_cached_link(link, page_path, None)
+
     def _request_via_cached_link(
         self,
         link: RNS.Link,
@@ -368,10 +736,39 @@ class NomadNetWebBrowser:
 
     def start_monitoring(self) -> None:
         self.running = True
+        self.path_monitor.start()
+        self.announce_log.start()
+        self.downloads.start()
+        self.prefetcher.start()
+        self.prewarmer.start()
+        self.reachability.start()
+        threading.Thread(target=self._node_limit_worker, daemon=True).start()
         print("=" * 90)
         print("📡 Started NomadNet announce monitoring")
         print("=" * 90)
 
+    def enforce_node_limits(self) -> int:
+        """Evict stale and least recently seen nodes per the node settings."""
+        max_age_days = self.cache_settings.get("node_max_age_days", -1)
+        evicted = self.registry.evict(
+            max_count=self.cache_settings.get("node_max_count", -1),
+            max_age=max_age_days * 86400 if max_age_days >= 0 else -1,
+        )
+        if evicted:
+            print(f"🧹 Evicted {evicted} stale nodes from the node list")
+        return evicted
+
+    def _node_limit_worker(self) -> None:
+        # Also covers nodes restored from disk that aged out while offline.
+        while self.running:
+            try:
+                self.enforce_node_limits()
+            except Exception as exc:
+                print(f"Node eviction error: {exc}")
+            # File cache hits only mark its index dirty; write it back here.
+            self.file_cache.save_if_dirty()
+            time.sleep(self.NODE_EVICTION_INTERVAL)
+
     def get_node_hops(self, destination_hash: str) -> Dict[str, Any]:
         """Get the number of hops to a destination."""
         try:
@@ -411,6 +808,13 @@ class NomadNetWebBrowser:
             print(f"Error getting path info to {destination_hash}: {exc}")
             return {"hops": "Unknown", "next_hop_interface": "Unknown"}
 
+    def node_interface(self, node_hash: str) -> str:
+        """Next-hop interface of a node, from its registry record when known."""
+        record = self.registry.get(node_hash)
+        if record is not None and record.next_hop_interface != "Unknown":
+            return record.next_hop_interface
+        return self.get_node_hops(node_hash)["next_hop_interface"]
+
     def get_node_path_info(self, destination_hash: str) -> Dict[str, Any]:
         """Backward compatible alias used by the API routes."""
         return self.get_node_hops(destination_hash)
@@ -430,7 +834,10 @@ class NomadNetWebBrowser:
         try:
             print(f"Pinging node {node_hash[:16]}...")
             browser = NomadNetBrowser(self, node_hash)
-            return browser.send_ping()
+            with self.priority.interactive(node_hash, self.node_interface(node_hash)):
+                response = browser.send_ping()
+            self.reachability.record(node_hash, response.get("rtt") if response["status"] == "success" else None)
+            return response
         except Exception as exc:
             print(f"Ping failed: {exc}")
             return {"error": f"Ping failed: {exc}", "message": "", "status": "error"}